@@ -0,0 +1,114 @@
+'''
+Benchmark of multi-row transaction upserts of processor.mapper:
+    baseline - schema before identity hash, conflict target tr_constraint
+               (transaction_date, account, amount, description);
+    SQL hash - conflict target tr_identity, identity_hash calculated by transaction_identity() SQL function;
+    Python hash - conflict target tr_identity, identity_hash calculated by mapper (current code).
+Only upserts into transaction table are timed, categories and rollup are the same for all variants.
+
+The benchmark creates and drops database DB_NAME, so run it with a scratch database name.
+Usage: DB_NAME=monefystat_benchmark python -m benchmarks.identity_hash_benchmark [number_of_rows]
+'''
+import sys
+import random
+import asyncio
+from timeit import default_timer
+from datetime import date, timedelta
+
+from alembic import command
+from sqlalchemy import Date, Float, String
+from sqlalchemy.sql import func, cast
+
+from config import ingest
+from database import helpers
+from processor import mapper
+
+# the last revision with tr_constraint
+BASELINE_REVISION = 'b5390713040a'
+
+
+def generate_rows(count: int) -> list:
+    '''Generates converted csv rows with a few hundred distinct dates, like real exports.'''
+    random.seed(0)
+    rows = []
+    for index in range(count):
+        amount = round(random.uniform(-5000, 5000), 2)
+        day = date(2017, 1, 1) + timedelta(days=random.randint(0, 365))
+        rows.append([day, 'Cash', 'Food', amount, 'UAH', amount, 'UAH', 'description {}'.format(index)])
+    return rows
+
+
+def sql_identity_hash(transaction_date, account, amount, description):
+    '''The hash is calculated by database for every row.'''
+    return func.transaction_identity(cast(transaction_date, Date), cast(account, String),
+                                     cast(amount, Float), cast(description, String))
+
+
+async def measure(transactions: list, constraint: str, identity_hash=None) -> tuple:
+    '''
+    Upserts rows twice: into empty table and over the same rows.
+
+    :param list transactions: converted csv rows.
+    :param str constraint: conflict target of the upsert.
+    :param identity_hash: function which returns identity_hash of the row, None if schema has no hash.
+    :return tuple: inserted and updated rows per second.
+    '''
+    rows, titles = mapper._unique_transactions(transactions)
+    engine = await helpers.get_engine()
+    async with engine.acquire() as connection:
+        await connection.execute('truncate transaction, daily_category_totals')
+        categories = await mapper.insert_select_categories(titles, connection)
+
+    speed = []
+    for _ in range(2):
+        start = default_timer()
+        async with engine.acquire() as connection:
+            async with connection.begin():
+                for offset in range(0, len(rows), ingest['batch_size']):
+                    batch = []
+                    for row in rows[offset:offset + ingest['batch_size']]:
+                        row = dict(row, category=categories[row['category']])
+                        if identity_hash is not None:
+                            row['identity_hash'] = identity_hash(
+                                row['transaction_date'], row['account'], row['amount'], row['description'])
+                        batch.append(row)
+                    await mapper._upsert_batch(batch, connection, constraint)
+        speed.append(len(rows) / (default_timer() - start))
+    return tuple(speed)
+
+
+async def migrate(revision: str) -> None:
+    await helpers.close_engine()
+    alembic_config = helpers.AlembicConfig(helpers.ALEMBIC_CONFIG)
+    alembic_config.attributes['configure_logger'] = False
+    loop = asyncio.get_event_loop()
+    if revision == 'head':
+        await loop.run_in_executor(None, command.upgrade, alembic_config, revision)
+    else:
+        await loop.run_in_executor(None, command.downgrade, alembic_config, revision)
+
+
+async def main(count: int) -> None:
+    rows = generate_rows(count)
+    await helpers.create_db()
+    try:
+        await migrate(BASELINE_REVISION)
+        results = [('baseline', await measure(rows, 'tr_constraint'))]
+        await migrate('head')
+        results.append(('SQL hash', await measure(rows, 'tr_identity', sql_identity_hash)))
+        results.append(('Python hash', await measure(rows, 'tr_identity', mapper._identity_hash)))
+    finally:
+        await helpers.drop_db()
+
+    baseline_insert, baseline_update = results[0][1]
+    print('{:<13}{:>12} {:>12} {:>16} {:>16}'.format('', 'insert', 'update', 'insert us/row', 'update us/row'))
+    for name, (insert, update) in results:
+        print('{:<13}{:>12,.0f} {:>12,.0f} {:>16.1f} {:>16.1f}  rows/sec'.format(
+            name + ':', insert, update, 1e6 / insert, 1e6 / update))
+    insert, update = results[-1][1]
+    print('Python hash vs baseline: {:.2f}x insert, {:.2f}x update'.format(
+        insert / baseline_insert, update / baseline_update))
+
+
+if __name__ == '__main__':
+    asyncio.get_event_loop().run_until_complete(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000))
@@ -0,0 +1,45 @@
+'''
+Micro-benchmark of csv row conversion in processor.validator_data.
+
+Usage: python -m benchmarks.validator_data_benchmark [number_of_rows]
+'''
+import sys
+import random
+from timeit import default_timer
+from datetime import date, timedelta
+
+from processor import validator_data
+
+
+def generate_rows(count: int) -> list:
+    '''Generates raw csv rows with a few hundred distinct dates, like real exports.'''
+    random.seed(0)
+    rows = []
+    for _ in range(count):
+        amount = '{:,.2f}'.format(random.uniform(-5000, 5000))
+        if random.random() < 0.5:
+            amount = amount.replace(',', ' ').replace('.', ',')
+        day = date(2017, 1, 1) + timedelta(days=random.randint(0, 365))
+        rows.append([day.strftime('%d/%m/%Y'), 'Cash', 'Food', amount, 'UAH', amount, 'UAH', 'some description'])
+    return rows
+
+
+def measure(convert, rows: list) -> float:
+    '''Returns converted rows per second.'''
+    start = default_timer()
+    for row in rows:
+        convert(row)
+    return len(rows) / (default_timer() - start)
+
+
+def main(count: int) -> None:
+    rows = generate_rows(count)
+    current = measure(lambda row: validator_data.convert_type(validator_data.convert_row(row)), rows)
+    fast = measure(validator_data.fast_convert_row, rows)
+    print('convert_type(convert_row(row)): {:>12,.0f} rows/sec'.format(current))
+    print('fast_convert_row(row):          {:>12,.0f} rows/sec'.format(fast))
+    print('speedup:                        {:>12.2f}x'.format(fast / current))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
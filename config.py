@@ -9,12 +9,26 @@ web = {
     'port': int(env.get('WEB_PORT', '4000'))
 }
 
+api = {
+    'page_size': int(env.get('API_PAGE_SIZE', 100)),
+    'max_page_size': int(env.get('API_MAX_PAGE_SIZE', 1000)),
+    'export_batch_size': int(env.get('API_EXPORT_BATCH_SIZE', 1000))
+}
+
 db = {
     'user': env.get('DB_USER', 'postgres'),
     'password': env.get('DB_PASSWORD', ''),
     'host': env.get('DB_HOST', 'localhost'),
     'port': int(env.get('DB_PORT', 5432)),
-    'dbname': env.get('DB_NAME', 'monefystat')
+    'dbname': env.get('DB_NAME', 'monefystat'),
+    'pool_minsize': int(env.get('DB_POOL_MINSIZE', 1)),
+    'pool_maxsize': int(env.get('DB_POOL_MAXSIZE', 10)),
+    'pool_timeout': float(env.get('DB_POOL_TIMEOUT', 60.0))
+}
+
+cache = {
+    'data_period_size': int(env.get('CACHE_DATA_PERIOD_SIZE', 256)),
+    'data_period_ttl': float(env.get('CACHE_DATA_PERIOD_TTL', 60.0))
 }
 
 dropbox = {
@@ -22,5 +36,21 @@ dropbox = {
 }
 
 telegram = {
-    'token': env.get('TELEGRAM_BOT_TOKEN')
+    'token': env.get('TELEGRAM_BOT_TOKEN'),
+    'api_url': env.get('TELEGRAM_API_URL', 'https://api.telegram.org/bot{0}/{1}'),
+    # 'polling' runs the bot in separate process, 'webhook' receives updates on /telegram/<webhook_secret> route
+    'mode': env.get('TELEGRAM_MODE', 'polling'),
+    'webhook_url': env.get('TELEGRAM_WEBHOOK_URL'),
+    'webhook_secret': env.get('TELEGRAM_WEBHOOK_SECRET'),
+    'sessions_size': int(env.get('TELEGRAM_SESSIONS_SIZE', 1000)),
+    'session_ttl': float(env.get('TELEGRAM_SESSION_TTL', 900.0)),
+    'calendar_cache_size': int(env.get('TELEGRAM_CALENDAR_CACHE_SIZE', 24)),
+    'limits_cache_ttl': float(env.get('TELEGRAM_LIMITS_CACHE_TTL', 30.0))
+}
+
+ingest = {
+    'batch_size': int(env.get('INGEST_BATCH_SIZE', 1000)),
+    'copy_threshold': int(env.get('INGEST_COPY_THRESHOLD', 5000)),
+    'jobs_history': int(env.get('INGEST_JOBS_HISTORY', 100)),
+    'debounce': float(env.get('INGEST_DEBOUNCE', 5.0))
 }
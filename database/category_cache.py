@@ -0,0 +1,76 @@
+from sqlalchemy import select
+
+from database.models import Category
+
+
+class CategoryCache(object):
+    '''
+    This is CategoryCache class. It keeps ids of categories by titles in memory of the process.
+    Category table is small and ids of titles never change, so the cache is only filled:
+    it is loaded as a whole, extended with inserted categories and invalidated when
+    categories are added by SQL which does not return their ids.
+    Methods:
+        load
+        get
+        add
+        update
+        invalidate
+    '''
+    def __init__(self):
+        self._ids = {}
+        self._loaded = False
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    async def load(self, connection: object) -> None:
+        '''
+        This method loads ids of all categories.
+
+        :param connection: connection object.
+        :rtype: None
+        '''
+        result = await connection.execute(select([Category.id, Category.title]))
+        self._ids = {row['title']: row['id'] for row in await result.fetchall()}
+        self._loaded = True
+
+    def get(self, title: str) -> int or None:
+        '''
+        This method returns id of category.
+
+        :param str title: title of category.
+        :return int: id of category or None if category is not cached.
+        '''
+        return self._ids.get(title)
+
+    def add(self, title: str, category_id: int) -> None:
+        '''
+        This method caches id of committed category.
+
+        :param str title: title of category.
+        :param int category_id: id of category.
+        :rtype: None
+        '''
+        self._ids[title] = category_id
+
+    def update(self, ids: dict) -> None:
+        '''
+        This method caches ids of committed categories.
+
+        :param dict ids: ids of categories by titles.
+        :rtype: None
+        '''
+        self._ids.update(ids)
+
+    def invalidate(self) -> None:
+        '''
+        This method drops cached ids, they will be loaded again on next lookup.
+
+        :rtype: None
+        '''
+        self._ids = {}
+        self._loaded = False
+
+
+category_cache = CategoryCache()
@@ -0,0 +1,100 @@
+import asyncio
+from uuid import uuid4
+
+import aiopg
+import psycopg2
+
+CHANNEL = 'monefystat_data_version'
+
+
+class DataVersion(object):
+    '''
+    This is DataVersion class. It is counter of changes of transactions and limits.
+    The counter is bumped by the process which changed data, other processes get
+    NOTIFY on CHANNEL and bump their counters in background listener.
+    Changes of other processes are seen only while `listening` is True.
+    Methods:
+        bump
+        start
+        stop
+    '''
+    def __init__(self):
+        # counters of different processes and restarts are not comparable
+        self.epoch = uuid4().hex[:12]
+        self.value = 0
+        self.listening = False
+        self._listener = None
+        self._stopping = False
+        self._connecting = False
+
+    @property
+    def started(self) -> bool:
+        return self._listener is not None
+
+    def bump(self) -> int:
+        '''
+        This method increments data version.
+
+        :return int: new data version.
+        '''
+        self.value += 1
+        return self.value
+
+    def start(self, dsn: str, retry_delay=5.0) -> None:
+        '''
+        This method starts background listener of CHANNEL on the running event loop.
+
+        :param str dsn: dsn of database.
+        :param float retry_delay: number of seconds between reconnects.
+        :rtype: None
+        '''
+        self._stopping = False
+        self._listener = asyncio.ensure_future(self._listen(dsn, retry_delay))
+
+    async def stop(self) -> None:
+        '''
+        This method stops background listener and waits until its connection is closed.
+
+        :rtype: None
+        '''
+        if self._listener is not None:
+            self._stopping = True
+            # aiopg 0.13 leaves connection open if it is cancelled while it connects,
+            # so connecting listener is not cancelled, it checks the flag when connected
+            if not self._connecting:
+                self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self, dsn: str, retry_delay: float) -> None:
+        while not self._stopping:
+            try:
+                self._connecting = True
+                try:
+                    connection = await aiopg.connect(dsn)
+                except psycopg2.Error:
+                    connection = None
+                finally:
+                    self._connecting = False
+                if connection is not None:
+                    async with connection:
+                        async with connection.cursor() as cursor:
+                            await cursor.execute('listen {}'.format(CHANNEL))
+                        # notifications could be missed while listener was disconnected
+                        self.bump()
+                        self.listening = True
+                        while not self._stopping:
+                            await connection.notifies.get()
+                            self.bump()
+            except psycopg2.Error:
+                pass
+            finally:
+                self.listening = False
+            if not self._stopping:
+                await asyncio.sleep(retry_delay)
+
+
+data_version = DataVersion()
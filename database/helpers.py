@@ -1,22 +1,51 @@
-import sys
-import inspect
+import asyncio
+from os import path
 from typing import List, Dict
-from collections import namedtuple
 from datetime import datetime, timedelta
 
 import psycopg2
 from aiopg.sa import create_engine
-from sqlalchemy import select, and_
-from sqlalchemy.schema import CreateTable, DropTable
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import select, and_, tuple_, func, case, cast, Date
 from sqlalchemy.dialects.postgresql import insert
 
-from database import models
-from database.models import Transaction, Category
-from config import db
+from database.models import Transaction, Category, DailyCategoryTotal, ImportState, ImportedRow
+from database.category_cache import category_cache
+from database.data_version import data_version, CHANNEL
+from database.query_cache import QueryCache
+from config import db, cache
+
+TOTALS_BUCKETS = ('day', 'week', 'month', 'year')
+
+ALEMBIC_CONFIG = path.join(path.dirname(path.dirname(path.abspath(__file__))), 'alembic.ini')
+
+DAILY_TOTALS_COLUMNS = 'transaction_date, category, currency, is_debet'
+
+DELETE_DAILY_TOTALS = 'delete from daily_category_totals where transaction_date = any(%(dates)s)'
+
+INSERT_DAILY_TOTALS = '''
+    insert into daily_category_totals ({columns}, amount, converted_amount, count)
+    select {columns}, sum(amount), sum(converted_amount), count(*)
+    from transaction
+    {{where}}
+    group by {columns}
+'''.format(columns=DAILY_TOTALS_COLUMNS)
+
+REFRESH_DAILY_TOTALS = (
+    DELETE_DAILY_TOTALS,
+    INSERT_DAILY_TOTALS.format(where='where transaction_date = any(%(dates)s)')
+)
+
+REBUILD_DAILY_TOTALS = ('truncate daily_category_totals', INSERT_DAILY_TOTALS.format(where=''))
 
 dsn_def = 'user={user} password={password} host={host} port={port}'.format(**db)
 dsn = 'user={user} dbname={dbname} host={host} password={password}'.format(**db)
 
+_engine = None
+
+data_period_cache = QueryCache(maxsize=cache['data_period_size'], ttl=cache['data_period_ttl'])
+
 
 async def _create_default_engine():
     '''Asynchronous function for creating default engine.'''
@@ -26,89 +55,192 @@ async def _create_default_engine():
 
 async def _create_engine():
     '''Asynchronous function for creating engine.'''
-    engine = await create_engine(dsn)
+    engine = await create_engine(dsn,
+                                 minsize=db['pool_minsize'],
+                                 maxsize=db['pool_maxsize'],
+                                 timeout=db['pool_timeout'])
     return engine
 
 
+async def get_engine():
+    '''
+    Asynchronous function for getting shared engine of the current process.
+    Engine is created on first call and reused by all helpers until `close_engine()`.
+    '''
+    global _engine
+    if _engine is None:
+        _engine = await _create_engine()
+    return _engine
+
+
+async def init_engine() -> None:
+    '''
+    Asynchronous function for opening shared engine and loading category cache on process start.
+    If database is not created yet, engine will be opened and cache loaded on first use.
+    '''
+    try:
+        engine = await get_engine()
+        async with engine.acquire() as connection:
+            await category_cache.load(connection)
+    except (psycopg2.OperationalError, psycopg2.ProgrammingError):
+        pass
+
+
+async def close_engine() -> None:
+    '''Asynchronous function for closing shared engine of the current process.'''
+    global _engine
+    if _engine is not None:
+        engine, _engine = _engine, None
+        engine.close()
+        await engine.wait_closed()
+
+
+class AdvisoryLock(object):
+    '''
+    Asynchronous context manager for PostgreSQL session level advisory lock.
+    Lock is held on a dedicated connection of shared engine, so it is exclusive
+    between all processes which use the same database.
+    '''
+    def __init__(self, key: int):
+        '''
+        :param int key: key of the lock.
+        '''
+        self._key = key
+        self._engine = None
+        self._connection = None
+
+    async def __aenter__(self):
+        self._engine = await get_engine()
+        self._connection = await self._engine.acquire()
+        try:
+            await self._connection.execute('select pg_advisory_lock(%s)', (self._key,))
+        except Exception:
+            await self._engine.release(self._connection)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            await self._connection.execute('select pg_advisory_unlock(%s)', (self._key,))
+        finally:
+            await self._engine.release(self._connection)
+            self._connection = None
+
+
 async def create_db() -> None:
     '''Asynchronous function for creating database.'''
     default_engine = await _create_default_engine()
     async with default_engine:
         async with default_engine.acquire() as connection:
             await connection.execute('create database {}'.format(db['dbname']))
-            await _prepare_tables()
+    category_cache.invalidate()
+    await upgrade_db()
 
 
 async def drop_db() -> None:
-    '''Asynchronous function for dropping database.'''
+    '''
+    Asynchronous function for dropping database.
+    Connections of the process are closed first, data version listener is started again afterwards
+    and reconnects when database is created.
+    '''
+    listening = data_version.started
+    await data_version.stop()
+    await close_engine()
+    category_cache.invalidate()
     default_engine = await _create_default_engine()
-    async with default_engine:
-        async with default_engine.acquire() as connection:
-            await connection.execute('drop database {}'.format(db['dbname']))
+    try:
+        async with default_engine:
+            async with default_engine.acquire() as connection:
+                await connection.execute('drop database {}'.format(db['dbname']))
+    finally:
+        if listening:
+            data_version.start(dsn)
 
 
-async def _get_model_classes() -> list:
-    ''' Asynchronous function for getting model classes. '''
-    Clsmember = namedtuple('Clsmember', ['cls_name', 'cls_def'])
-    clsmembers = [Clsmember(member[0], member[1]) for member in inspect.getmembers(sys.modules[models.__name__],
-                                                                                   inspect.isclass)]
-
-    accumulator = []
-    for el in clsmembers:
-        if el.cls_name != models.Base.__name__ and issubclass(el.cls_def, models.Base):
-            accumulator.append(el)
-    return accumulator
-
+async def upgrade_db(revision='head') -> None:
+    '''
+    Asynchronous function for upgrading database schema with alembic migrations.
+    Alembic is synchronous, so migrations run in the default executor.
 
-async def _get_tables() -> list:
-    ''' Asynchronous function for getting tables. '''
-    model_classes = await _get_model_classes()
-    result = []
-    for model in model_classes:
-        result.append(model.cls_def.__table__)
-    return result
+    :param str revision: target revision.
+    '''
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, _upgrade_db, revision)
 
 
-async def _prepare_tables() -> None:
-    '''Asynchronous function for creating tables in database.'''
-    tables = await _get_tables()
-    engine = await _create_engine()
-    async with engine:
-        async with engine.acquire() as connection:
-            await _drop_tables(engine, tables)
-            for table in tables:
-                create_query = CreateTable(table)
-                await connection.execute(create_query)
+def _upgrade_db(revision: str) -> None:
+    alembic_config = AlembicConfig(ALEMBIC_CONFIG)
+    alembic_config.attributes['configure_logger'] = False
+    command.upgrade(alembic_config, revision)
 
 
-async def _drop_tables(engine, tables):
+async def get_all_data() -> list:
     '''
-    Asynchronous function for dropping tables in database.
-
-    :param Engine engine: engine of database
-    :param list tables: list of tables to dropping
+    Asynchronous function for getting all data from database.
+    :return list: list of dictionaries with all data
     '''
+    engine = await get_engine()
     async with engine.acquire() as connection:
-        for table in reversed(tables):
-            drop_query = DropTable(table)
-            try:
-                await connection.execute(drop_query)
-            except psycopg2.ProgrammingError:
-                pass
+        query = 'select * from transaction'
+        result = await connection.execute(query)
+        return _convert_resultproxy_to_dictionary(result)
 
 
-async def get_all_data() -> list:
+async def get_data_page(limit: int, after=None, category_name=None, start_date=None, end_date=None) -> list:
     '''
-    Asynchronous function for getting all data from database.
-    :return list: list of dictionaries with all data
+    Asynchronous function for getting one page of transactions ordered by (transaction_date, id).
+    Keyset pagination uses index ix_transaction_date_id, so every page costs the same.
+
+    :param int limit: max number of rows in the page.
+    :param tuple after: (transaction_date, id) of the last row of previous page, None for the first page.
+    :param str category_name: name of category to filter by.
+    :param date start_date: first date of the period to filter by.
+    :param date end_date: last date of the period to filter by.
+    :return list: list of dictionaries with rows of transaction table.
     '''
-    engine = await _create_engine()
+    conditions = []
+    if after is not None:
+        conditions.append(tuple_(Transaction.transaction_date, Transaction.id) > tuple_(*after))
+    if category_name is not None:
+        category_id = await get_category_id(_category_name_decoder(category_name))
+        if category_id is None:
+            return []
+        conditions.append(Transaction.category == category_id)
+    if start_date is not None:
+        conditions.append(Transaction.transaction_date >= start_date)
+    if end_date is not None:
+        conditions.append(Transaction.transaction_date <= end_date)
+
+    query = select([Transaction]).where(and_(*conditions)).order_by(
+        Transaction.transaction_date, Transaction.id).limit(limit)
+    engine = await get_engine()
     async with engine.acquire() as connection:
-        query = 'select * from transaction'
         result = await connection.execute(query)
         return _convert_resultproxy_to_dictionary(result)
 
 
+async def iter_all_data(batch_size=1000):
+    '''
+    Asynchronous generator of all rows of transaction table ordered by (transaction_date, id).
+    Rows are read through server-side cursor in batches of `batch_size`, so only one batch
+    is kept in memory.
+
+    :param int batch_size: number of rows fetched from cursor at once.
+    :return: yields lists of dictionaries with rows.
+    '''
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        async with connection.begin():
+            await connection.execute('declare transaction_export no scroll cursor for '
+                                     'select * from transaction order by transaction_date, id')
+            while True:
+                result = await connection.execute('fetch forward {:d} from transaction_export'.format(batch_size))
+                rows = _convert_resultproxy_to_dictionary(result)
+                if not rows:
+                    break
+                yield rows
+
+
 def _convert_resultproxy_to_dictionary(result_proxy):
     '''
     Convert ResultProxy object to list of dictionaries.
@@ -125,6 +257,9 @@ def _convert_resultproxy_to_dictionary(result_proxy):
 async def get_data_period(category_name: str, period=None, start_date=None, end_date=None) -> list:
     '''
     Asynchronous function for getting all data for specified category and period(days) from database.
+    Results are cached in `data_period_cache` by category and resolved dates until data version changes,
+    returned list must not be changed. Cache is used only while data version listener is connected,
+    otherwise changes made by other processes would not be seen.
     :param str category_name: bytearray with name of category
     :param str period: some digit which represent some period in past from current date
     :param str start_date: start date of the period
@@ -132,17 +267,150 @@ async def get_data_period(category_name: str, period=None, start_date=None, end_
     '''
     start_date, end_date = _date_validator(period=period, start_date=start_date, end_date=end_date)
     category_name = _category_name_decoder(category_name)
-    engine = await _create_engine()
-    async with engine.acquire() as connection:
-        id_query = select([Category.id]).where(Category.title == category_name)
-        data_query = select([Transaction]).where(
-            and_(
-                Transaction.category == id_query,
-                (Transaction.transaction_date.between(start_date, end_date))
+    key = (category_name, start_date, end_date)
+    cached = data_version.listening
+    version = data_version.value
+    if cached:
+        data = data_period_cache.get(key, version)
+        if data is not None:
+            return data
+
+    data = []
+    category_id = await get_category_id(category_name)
+    if category_id is not None:
+        engine = await get_engine()
+        async with engine.acquire() as connection:
+            data_query = select([Transaction]).where(
+                and_(
+                    Transaction.category == category_id,
+                    (Transaction.transaction_date.between(start_date, end_date))
+                    )
                 )
-            )
-        result = await connection.execute(data_query)
-    return _convert_resultproxy_to_dictionary(result)
+            result = await connection.execute(data_query)
+            data = _convert_resultproxy_to_dictionary(result)
+    if cached:
+        data_period_cache.set(key, version, data)
+    return data
+
+
+async def get_totals(start_date, end_date, bucket='month', category_name=None) -> list:
+    '''
+    Asynchronous function for getting totals of transactions grouped by category, time bucket and currency.
+    Sums are calculated by one GROUP BY query over daily_category_totals rollup,
+    debet and credit are summed separately, amounts of different currencies are never summed together.
+
+    :param date start_date: first date of the period.
+    :param date end_date: last date of the period.
+    :param str bucket: one of TOTALS_BUCKETS.
+    :param str category_name: name of category to filter by, None for all categories.
+    :return list: list of dictionaries like this:
+        [
+            {
+                'category': str,
+                'bucket': date,
+                'currency': str,
+                'debet_amount': float,
+                'credit_amount': float,
+                'debet_converted_amount': float,
+                'credit_converted_amount': float,
+                'count': int
+            }
+        ]
+    :raises: ValueError if bucket is unknown
+    '''
+    if bucket not in TOTALS_BUCKETS:
+        raise ValueError('unknown bucket {}'.format(bucket))
+
+    totals = DailyCategoryTotal
+    bucket_column = cast(func.date_trunc(bucket, totals.transaction_date), Date)
+    conditions = [totals.transaction_date.between(start_date, end_date)]
+    if category_name is not None:
+        category_id = await get_category_id(_category_name_decoder(category_name))
+        if category_id is None:
+            return []
+        conditions.append(totals.category == category_id)
+
+    query = select([
+        Category.title.label('category'),
+        bucket_column.label('bucket'),
+        totals.currency,
+        _sum_if(totals.is_debet, totals.amount).label('debet_amount'),
+        _sum_if(~totals.is_debet, totals.amount).label('credit_amount'),
+        _sum_if(totals.is_debet, totals.converted_amount).label('debet_converted_amount'),
+        _sum_if(~totals.is_debet, totals.converted_amount).label('credit_converted_amount'),
+        func.coalesce(func.sum(totals.count), 0).label('count')
+    ]).select_from(
+        totals.__table__.join(Category.__table__, totals.category == Category.id)
+    ).where(and_(*conditions)).group_by(
+        Category.title, bucket_column, totals.currency
+    ).order_by(bucket_column, Category.title, totals.currency)
+
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        result = await connection.execute(query)
+        return _convert_resultproxy_to_dictionary(result)
+
+
+def _sum_if(condition, column):
+    return func.coalesce(func.sum(case([(condition, column)], else_=0)), 0)
+
+
+async def refresh_daily_totals(dates, connection) -> None:
+    '''
+    Asynchronous function for recalculating daily_category_totals rollup for the given dates only.
+    Rows of `transaction` never move between dates on upsert, so recalculation of touched dates
+    also covers rows which moved between categories.
+
+    :param dates: collection of dates touched by ingest.
+    :param connection: connection object, rollup is updated in its current transaction.
+    '''
+    if not dates:
+        return
+    params = {'dates': list(dates)}
+    for query in REFRESH_DAILY_TOTALS:
+        await connection.execute(query, params)
+
+
+async def rebuild_daily_totals() -> None:
+    '''Asynchronous function for regenerating daily_category_totals rollup from transaction table.'''
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        async with connection.begin():
+            for query in REBUILD_DAILY_TOTALS:
+                await connection.execute(query)
+
+
+async def notify_data_changed() -> None:
+    '''
+    Asynchronous function for bumping data version after transactions or limits are changed.
+    Other processes are notified through NOTIFY on data version channel.
+    '''
+    data_version.bump()
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        await connection.execute('notify {}'.format(CHANNEL))
+
+
+async def get_category_id(title: str) -> int or None:
+    '''
+    Asynchronous function for getting id of category from process-local cache.
+    Cache is loaded as a whole on first use, then only missing titles are selected by the title index:
+    categories could be added by other process, and unknown titles must not reload the whole table.
+
+    :param str title: title of category.
+    :return int: id of category or None if category does not exist.
+    '''
+    category_id = category_cache.get(title)
+    if category_id is None:
+        engine = await get_engine()
+        async with engine.acquire() as connection:
+            if not category_cache.loaded:
+                await category_cache.load(connection)
+                return category_cache.get(title)
+            category_id = await connection.scalar(select([Category.id]).where(Category.title == title))
+        if category_id is not None:
+            category_cache.add(title, category_id)
+    return category_id
 
 
 def _category_name_decoder(category_name: str) -> str:
@@ -190,16 +458,15 @@ async def get_limit(category_name=None) -> List[Dict]:
             }
         ]
     '''
-    engine = await _create_engine()
-    async with engine:
-        async with engine.acquire() as connection:
-            if category_name:
-                s = select([Category]).where(Category.title == category_name)
-            else:
-                s = select([Category])
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        if category_name:
+            s = select([Category]).where(Category.title == category_name)
+        else:
+            s = select([Category])
 
-            result = await connection.execute(s)
-            return _convert_resultproxy_to_dictionary(result)
+        result = await connection.execute(s)
+        return _convert_resultproxy_to_dictionary(result)
 
 
 async def upsert_limit(category_name, **kwargs) -> None:
@@ -215,12 +482,13 @@ async def upsert_limit(category_name, **kwargs) -> None:
     :param bool is_repeated: checking limit should be repeated for the same period.
     :rtype: None
     '''
-    engine = await _create_engine()
-    async with engine:
-        async with engine.acquire() as connection:
-            ins = insert(Category).values(dict(title=category_name, **kwargs))
-            do_update_category = ins.on_conflict_do_update(index_elements=['title'], set_=kwargs)
-            await connection.execute(do_update_category)
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        ins = insert(Category).values(dict(title=category_name, **kwargs))
+        do_update_category = ins.on_conflict_do_update(index_elements=['title'], set_=kwargs).returning(Category.id)
+        result = await connection.execute(do_update_category)
+        category_cache.add(category_name, await result.scalar())
+    await notify_data_changed()
 
 
 async def delete_limit(category_name: str) -> None:
@@ -231,11 +499,75 @@ async def delete_limit(category_name: str) -> None:
     :rtype: None.
     '''
     category = Category.__table__
-    engine = await _create_engine()
-    async with engine:
-        async with engine.acquire() as connection:
-            delete = category.update().where(Category.title == category_name).values(limit=None,
-                                                                                     start_date=None,
-                                                                                     period=None,
-                                                                                     is_repeated=None)
-            await connection.execute(delete)
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        delete = category.update().where(Category.title == category_name).values(limit=None,
+                                                                                 start_date=None,
+                                                                                 period=None,
+                                                                                 is_repeated=None)
+        await connection.execute(delete)
+    await notify_data_changed()
+
+
+async def get_import_state(name: str) -> str or None:
+    '''
+    Asynchronous function for getting saved value of import state.
+
+    :param str name: name of the state value.
+    :return str: saved value or None.
+    '''
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        s = select([ImportState.value]).where(ImportState.name == name)
+        return await connection.scalar(s)
+
+
+async def set_import_state(name: str, value: str) -> None:
+    '''
+    Asynchronous function for saving value of import state.
+
+    :param str name: name of the state value.
+    :param str value: value to save.
+    :rtype: None
+    '''
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        ins = insert(ImportState).values(name=name, value=value, timestamp=datetime.utcnow())
+        do_update_state = ins.on_conflict_do_update(index_elements=['name'],
+                                                    set_=dict(value=value, timestamp=datetime.utcnow()))
+        await connection.execute(do_update_state)
+
+
+async def get_row_fingerprints(row_keys: list) -> Dict[str, str]:
+    '''
+    Asynchronous function for getting fingerprints of imported rows.
+
+    :param list row_keys: keys of the rows.
+    :return dict: fingerprints by row keys, only for already imported rows.
+    '''
+    if not row_keys:
+        return {}
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        s = select([ImportedRow.row_key, ImportedRow.fingerprint]).where(ImportedRow.row_key.in_(row_keys))
+        result = await connection.execute(s)
+        return {row['row_key']: row['fingerprint'] for row in await result.fetchall()}
+
+
+async def upsert_row_fingerprints(fingerprints: Dict[str, str], batch_size=1000) -> None:
+    '''
+    Asynchronous function for saving fingerprints of imported rows.
+
+    :param dict fingerprints: fingerprints by row keys.
+    :param int batch_size: number of rows in one INSERT statement.
+    :rtype: None
+    '''
+    values = [dict(row_key=key, fingerprint=fingerprint) for key, fingerprint in fingerprints.items()]
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        async with connection.begin():
+            for start in range(0, len(values), batch_size):
+                ins = insert(ImportedRow).values(values[start:start + batch_size])
+                do_update_row = ins.on_conflict_do_update(index_elements=['row_key'],
+                                                          set_=dict(fingerprint=ins.excluded.fingerprint))
+                await connection.execute(do_update_row)
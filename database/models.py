@@ -1,6 +1,7 @@
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Float, Boolean, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Float, Boolean, Integer, String, Date, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import UUID
 from datetime import datetime
 
 Base = declarative_base()
@@ -22,7 +23,12 @@ class Category(Base):
 class Transaction(Base):
     __tablename__ = 'transaction'
     __table_args__ = (
-        UniqueConstraint('transaction_date', 'account', 'amount', 'description', name='tr_constraint'),
+        # identity_hash = transaction_identity(transaction_date, account, amount, description)
+        UniqueConstraint('identity_hash', name='tr_identity'),
+        # keyset pagination of /data
+        Index('ix_transaction_date_id', 'transaction_date', 'id'),
+        Index('ix_transaction_category_date', 'category', 'transaction_date'),
+        Index('ix_transaction_date_brin', 'transaction_date', postgresql_using='brin'),
     )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
@@ -36,3 +42,47 @@ class Transaction(Base):
     converted_currency = Column('converted_currency', String)
     description = Column('description', String, nullable=True)
     is_debet = Column('is_debet', Boolean)
+    identity_hash = Column('identity_hash', UUID, nullable=False)
+
+
+class DailyCategoryTotal(Base):
+    __tablename__ = 'daily_category_totals'
+
+    transaction_date = Column('transaction_date', Date, primary_key=True)
+    category = Column('category', Integer, ForeignKey('category.id'), primary_key=True)
+    currency = Column('currency', String, primary_key=True)
+    is_debet = Column('is_debet', Boolean, primary_key=True)
+    amount = Column('amount', Float, nullable=False)
+    converted_amount = Column('converted_amount', Float, nullable=False)
+    count = Column('count', Integer, nullable=False)
+
+
+class TransactionStaging(Base):
+    __tablename__ = 'transaction_staging'
+    __table_args__ = {'prefixes': ['UNLOGGED']}
+
+    line = Column('line', Integer, primary_key=True, autoincrement=False)
+    transaction_date = Column('transaction_date', Date)
+    account = Column('account', String)
+    category = Column('category', String)
+    amount = Column('amount', Float)
+    currency = Column('currency', String)
+    converted_amount = Column('converted_amount', Float)
+    converted_currency = Column('converted_currency', String)
+    description = Column('description', String, nullable=True)
+    is_debet = Column('is_debet', Boolean)
+
+
+class ImportState(Base):
+    __tablename__ = 'import_state'
+
+    name = Column('name', String(255), primary_key=True)
+    timestamp = Column('timestamp', DateTime, default=datetime.utcnow())
+    value = Column('value', String, nullable=True)
+
+
+class ImportedRow(Base):
+    __tablename__ = 'imported_row'
+
+    row_key = Column('row_key', String(32), primary_key=True)
+    fingerprint = Column('fingerprint', String(32), nullable=False)
@@ -0,0 +1,80 @@
+import time
+from collections import OrderedDict
+
+
+class QueryCache(object):
+    '''
+    This is QueryCache class. It is in-process LRU cache of query results with TTL.
+    Every entry remembers data version it was read at, entries of older versions are misses,
+    so bump of data version invalidates the whole cache at once.
+    Methods:
+        get
+        set
+        clear
+        stats
+    '''
+    def __init__(self, maxsize=256, ttl=60.0):
+        '''
+        :param int maxsize: max number of cached results.
+        :param float ttl: number of seconds result is kept.
+        '''
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version: int):
+        '''
+        This method returns cached result.
+
+        :param key: hashable key of the query.
+        :param int version: current data version.
+        :return: cached result or None on miss.
+        '''
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry_version, expires, value = entry
+            if entry_version == version and expires > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, version: int, value) -> None:
+        '''
+        This method caches result, the least recently used result is evicted when cache is full.
+
+        :param key: hashable key of the query.
+        :param int version: data version result was read at.
+        :param value: result, it must not be changed by callers.
+        :rtype: None
+        '''
+        self._entries[key] = (version, time.monotonic() + self._ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        '''
+        This method drops all cached results.
+
+        :rtype: None
+        '''
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        '''
+        This method returns counters of the cache.
+
+        :return dict: like {'hits': int, 'misses': int, 'size': int, 'maxsize': int, 'ttl': float}.
+        '''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._entries),
+            'maxsize': self._maxsize,
+            'ttl': self._ttl
+        }
@@ -1,11 +1,12 @@
 import asyncio
-from database.helpers import create_db, drop_db, get_all_data
+from database.helpers import create_db, drop_db, get_all_data, rebuild_daily_totals, close_engine
 
 
 def create_db_endpoint():
     '''Function for asynchronous creating database endpoint.'''
     loop = asyncio.get_event_loop()
     loop.run_until_complete(create_db())
+    loop.run_until_complete(close_engine())
     loop.close()
 
 
@@ -24,5 +25,14 @@ def get_all_data_endpoint():
     '''
     loop = asyncio.get_event_loop()
     all_data = loop.run_until_complete(get_all_data())
+    loop.run_until_complete(close_engine())
     loop.close()
     return all_data
+
+
+def rebuild_daily_totals_endpoint():
+    '''Function for asynchronous regenerating of daily_category_totals rollup from transaction table.'''
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(rebuild_daily_totals())
+    loop.run_until_complete(close_engine())
+    loop.close()
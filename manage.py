@@ -1,14 +1,53 @@
+import sys
+import asyncio
 from multiprocessing import Process
 from telegram_bot.bot_handlers import bot
 from monefystat_api import app
-from config import web
+from database import helpers
+from database.data_version import data_version
+from database.service_resorces import rebuild_daily_totals_endpoint
+from config import web, telegram
+
+
+def run_bot():
+    '''
+    Runs telegram bot polling with long-lived database pool and data version listener of the bot process
+    on one event loop, bot handlers run as coroutines on the same loop.
+    '''
+    # Telegram does not return updates by getUpdates while webhook is set
+    bot.remove_webhook()
+    loop = asyncio.get_event_loop()
+    loop.run_until_complete(helpers.init_engine())
+    data_version.start(helpers.dsn)
+    try:
+        loop.run_until_complete(bot.polling())
+    finally:
+        loop.run_until_complete(bot.join())
+        loop.run_until_complete(data_version.stop())
+        loop.run_until_complete(helpers.close_engine())
+
+
+def set_bot_webhook():
+    '''
+    Points webhook of telegram bot to /telegram route of the web app, updates are handled by the web app process.
+    '''
+    if not telegram['webhook_url'] or not telegram['webhook_secret']:
+        sys.exit('TELEGRAM_WEBHOOK_URL and TELEGRAM_WEBHOOK_SECRET are required in webhook mode')
+    bot.set_webhook(url='{}/telegram/{}'.format(telegram['webhook_url'].rstrip('/'), telegram['webhook_secret']))
+
 
 if __name__ == '__main__':
-    p1 = Process(target=bot.polling, kwargs={'none_stop': True})
-    p1.start()
+    if sys.argv[1:] == ['rebuild_daily_totals']:
+        rebuild_daily_totals_endpoint()
+        sys.exit()
 
-    p2 = Process(target=app.app.run, kwargs={'host': web['host'], 'port': web['port']})
-    p2.start()
+    processes = [Process(target=app.app.run, kwargs={'host': web['host'], 'port': web['port']})]
+    if telegram['mode'] == 'webhook':
+        set_bot_webhook()
+    else:
+        processes.append(Process(target=run_bot))
 
-    p1.join()
-    p2.join()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
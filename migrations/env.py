@@ -0,0 +1,55 @@
+import sys
+from os import path
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+from sqlalchemy.engine.url import URL
+
+# project modules are importable when alembic is run from command line
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from config import db  # noqa: E402
+from database.models import Base  # noqa: E402
+
+config = context.config
+
+# logging is not reconfigured when migrations are run by the application, see helpers.upgrade_db
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+url = URL('postgresql+psycopg2', username=db['user'], password=db['password'] or None,
+          host=db['host'], port=db['port'], database=db['dbname'])
+
+
+def run_migrations_offline():
+    '''Run migrations in 'offline' mode, SQL is written to the script output.'''
+    context.configure(url=url, target_metadata=target_metadata, literal_binds=True,
+                      transaction_per_migration=True)
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    '''
+    Run migrations in 'online' mode.
+    Every migration runs in its own transaction, so a migration which builds indexes
+    concurrently commits only its own work.
+    '''
+    connectable = create_engine(url, poolclass=pool.NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          transaction_per_migration=True)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,113 @@
+"""identity hash of transaction
+
+Revision ID: 873f9bdcd815
+Revises: b5390713040a
+Create Date: 2026-10-18 12:10:00.000000
+
+Unique constraint over (transaction_date, account, amount, description) is replaced with
+unique constraint over 16 bytes identity_hash of these fields. The hash is calculated by
+transaction_identity() SQL function from binary representation of date and amount, so it
+does not depend on DateStyle or extra_float_digits settings. NULL account and description
+are hashed as empty strings.
+
+Rows are backfilled and deduplicated (the row with the greatest id wins) in the migration
+transaction, then the unique index is built concurrently. Rows inserted while the index was built
+are deduplicated and backfilled under a lock in the next transaction, which also attaches the
+constraint and rebuilds daily_category_totals from the remaining rows.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '873f9bdcd815'
+down_revision = 'b5390713040a'
+branch_labels = None
+depends_on = None
+
+CREATE_IDENTITY_FUNCTION = r'''
+    create or replace function transaction_identity(transaction_date date, account text,
+                                                    amount double precision, description text)
+    returns uuid as $$
+        select md5(
+            int4send(transaction_date - date '2000-01-01')
+            || float8send(amount)
+            || convert_to(coalesce(account, ''), 'UTF8') || '\x00'::bytea
+            || convert_to(coalesce(description, ''), 'UTF8')
+        )::uuid
+    $$ language sql immutable
+'''
+
+BACKFILL_IDENTITY = '''
+    update transaction
+    set identity_hash = transaction_identity(transaction_date, account, amount, description)
+    where identity_hash is null
+'''
+
+DELETE_DUPLICATES = '''
+    delete from transaction t
+    using transaction newer
+    where newer.identity_hash = t.identity_hash and newer.id > t.id
+'''
+
+DELETE_UNHASHED_DUPLICATES = '''
+    with unhashed as (
+        select id, transaction_identity(transaction_date, account, amount, description) as identity_hash
+        from transaction
+        where identity_hash is null
+    ), candidates as (
+        select id, identity_hash from unhashed
+        union all
+        select hashed.id, hashed.identity_hash
+        from transaction hashed
+        join unhashed on unhashed.identity_hash = hashed.identity_hash
+    ), ranked as (
+        select id, row_number() over (partition by identity_hash order by id desc) as position
+        from candidates
+    )
+    delete from transaction where id in (select id from ranked where position > 1)
+'''
+
+# the same statements as helpers.REBUILD_DAILY_TOTALS at the time of this revision
+REBUILD_DAILY_TOTALS = (
+    'truncate daily_category_totals',
+    '''
+    insert into daily_category_totals (transaction_date, category, currency, is_debet,
+                                       amount, converted_amount, count)
+    select transaction_date, category, currency, is_debet, sum(amount), sum(converted_amount), count(*)
+    from transaction
+    group by transaction_date, category, currency, is_debet
+    '''
+)
+
+
+def upgrade():
+    op.execute(CREATE_IDENTITY_FUNCTION)
+    op.add_column('transaction', sa.Column('identity_hash', postgresql.UUID(), nullable=True))
+    op.execute(BACKFILL_IDENTITY)
+    op.execute(DELETE_DUPLICATES)
+
+    op.execute('COMMIT')
+    op.create_index('uq_transaction_identity_hash', 'transaction', ['identity_hash'], unique=True,
+                    postgresql_concurrently=True)
+    # rows inserted by the previous version of application while the index was built
+    op.execute('BEGIN')
+    op.execute('lock table transaction in share row exclusive mode')
+    op.execute(DELETE_UNHASHED_DUPLICATES)
+    op.execute(BACKFILL_IDENTITY)
+    # NULLs never conflict on unique constraint, so a row without hash would skip deduplication
+    op.alter_column('transaction', 'identity_hash', nullable=False)
+    op.execute('alter table transaction add constraint tr_identity unique using index uq_transaction_identity_hash')
+    op.drop_constraint('tr_constraint', 'transaction', type_='unique')
+    # sums and counts of deleted duplicates are still in the rollup
+    for query in REBUILD_DAILY_TOTALS:
+        op.execute(query)
+
+
+def downgrade():
+    op.create_unique_constraint('tr_constraint', 'transaction',
+                                ['transaction_date', 'account', 'amount', 'description'])
+    op.drop_constraint('tr_identity', 'transaction', type_='unique')
+    op.drop_column('transaction', 'identity_hash')
+    op.execute('drop function transaction_identity(date, text, double precision, text)')
@@ -0,0 +1,115 @@
+"""initial schema
+
+Revision ID: 9a41e8878f95
+Revises:
+Create Date: 2026-10-18 11:40:00.000000
+
+Databases created by helpers.create_db before migrations were introduced
+already have these tables, so only missing tables are created.
+Indexes of transaction are built concurrently by b5390713040a.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a41e8878f95'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _has_table(name):
+    return name in sa.inspect(op.get_bind()).get_table_names()
+
+
+def upgrade():
+    if not _has_table('category'):
+        op.create_table(
+            'category',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('title', sa.String(length=255), nullable=False),
+            sa.Column('limit', sa.Float(), nullable=True),
+            sa.Column('start_date', sa.Date(), nullable=True),
+            sa.Column('period', sa.Integer(), nullable=True),
+            sa.Column('is_repeated', sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('title')
+        )
+
+    if not _has_table('transaction'):
+        op.create_table(
+            'transaction',
+            sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('transaction_date', sa.Date(), nullable=True),
+            sa.Column('account', sa.String(), nullable=True),
+            sa.Column('category', sa.Integer(), nullable=True),
+            sa.Column('amount', sa.Float(), nullable=True),
+            sa.Column('currency', sa.String(), nullable=True),
+            sa.Column('converted_amount', sa.Float(), nullable=True),
+            sa.Column('converted_currency', sa.String(), nullable=True),
+            sa.Column('description', sa.String(), nullable=True),
+            sa.Column('is_debet', sa.Boolean(), nullable=True),
+            sa.ForeignKeyConstraint(['category'], ['category.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('transaction_date', 'account', 'amount', 'description', name='tr_constraint')
+        )
+
+    if not _has_table('daily_category_totals'):
+        op.create_table(
+            'daily_category_totals',
+            sa.Column('transaction_date', sa.Date(), nullable=False),
+            sa.Column('category', sa.Integer(), nullable=False),
+            sa.Column('currency', sa.String(), nullable=False),
+            sa.Column('is_debet', sa.Boolean(), nullable=False),
+            sa.Column('amount', sa.Float(), nullable=False),
+            sa.Column('converted_amount', sa.Float(), nullable=False),
+            sa.Column('count', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['category'], ['category.id']),
+            sa.PrimaryKeyConstraint('transaction_date', 'category', 'currency', 'is_debet')
+        )
+
+    if not _has_table('transaction_staging'):
+        op.create_table(
+            'transaction_staging',
+            sa.Column('line', sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column('transaction_date', sa.Date(), nullable=True),
+            sa.Column('account', sa.String(), nullable=True),
+            sa.Column('category', sa.String(), nullable=True),
+            sa.Column('amount', sa.Float(), nullable=True),
+            sa.Column('currency', sa.String(), nullable=True),
+            sa.Column('converted_amount', sa.Float(), nullable=True),
+            sa.Column('converted_currency', sa.String(), nullable=True),
+            sa.Column('description', sa.String(), nullable=True),
+            sa.Column('is_debet', sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint('line'),
+            prefixes=['UNLOGGED']
+        )
+
+    if not _has_table('import_state'):
+        op.create_table(
+            'import_state',
+            sa.Column('name', sa.String(length=255), nullable=False),
+            sa.Column('timestamp', sa.DateTime(), nullable=True),
+            sa.Column('value', sa.String(), nullable=True),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+    if not _has_table('imported_row'):
+        op.create_table(
+            'imported_row',
+            sa.Column('row_key', sa.String(length=32), nullable=False),
+            sa.Column('fingerprint', sa.String(length=32), nullable=False),
+            sa.PrimaryKeyConstraint('row_key')
+        )
+
+
+def downgrade():
+    op.drop_table('imported_row')
+    op.drop_table('import_state')
+    op.drop_table('transaction_staging')
+    op.drop_table('daily_category_totals')
+    op.drop_table('transaction')
+    op.drop_table('category')
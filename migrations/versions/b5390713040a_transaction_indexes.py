@@ -0,0 +1,46 @@
+"""indexes of transaction
+
+Revision ID: b5390713040a
+Revises: 9a41e8878f95
+Create Date: 2026-10-18 11:45:00.000000
+
+Indexes are built concurrently, so the table stays writable during upgrade.
+CREATE INDEX CONCURRENTLY can not run inside a transaction block: the transaction
+of this migration is committed first (env.py runs every migration in its own transaction).
+If a concurrent build fails, it leaves an INVALID index which must be dropped before retry.
+ix_transaction_date_id could be created by helpers.create_db before migrations were introduced.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5390713040a'
+down_revision = '9a41e8878f95'
+branch_labels = None
+depends_on = None
+
+
+def _has_index(table, name):
+    return name in [index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)]
+
+
+def upgrade():
+    op.execute('COMMIT')
+    # keyset pagination of get_data_page: order by transaction_date, id
+    if not _has_index('transaction', 'ix_transaction_date_id'):
+        op.create_index('ix_transaction_date_id', 'transaction', ['transaction_date', 'id'],
+                        postgresql_concurrently=True)
+    # get_data_period: category = ? and transaction_date between ? and ?
+    op.create_index('ix_transaction_category_date', 'transaction', ['category', 'transaction_date'],
+                    postgresql_concurrently=True)
+    # range scans by date over the whole history, transactions are appended roughly in date order
+    op.create_index('ix_transaction_date_brin', 'transaction', ['transaction_date'],
+                    postgresql_using='brin', postgresql_concurrently=True)
+
+
+def downgrade():
+    op.execute('COMMIT')
+    op.drop_index('ix_transaction_date_brin', table_name='transaction', postgresql_concurrently=True)
+    op.drop_index('ix_transaction_category_date', table_name='transaction', postgresql_concurrently=True)
+    op.drop_index('ix_transaction_date_id', table_name='transaction', postgresql_concurrently=True)
@@ -3,9 +3,15 @@ from monefystat_api.service_resource import \
         smoke_endpoint, \
         webhook_enable, \
         webhook_reciver, \
+        telegram_webhook, \
+        ingest_jobs, \
+        ingest_job, \
+        cache_stats, \
         drop_endpoint, \
         create_endpoint, \
         data_endpoint, \
+        export_endpoint, \
+        totals_endpoint, \
         get_data_for_custom_period_endpoint, \
         get_data_for_defined_period_endpoint, \
         set_limit, \
@@ -18,9 +24,15 @@ bp = Blueprint('api_v1')
 bp.add_route(smoke_endpoint, '/smoke', methods=['GET'])
 bp.add_route(webhook_enable, '/webhook', methods=['GET'])
 bp.add_route(webhook_reciver, '/webhook', methods=['POST'])
+bp.add_route(telegram_webhook, '/telegram/<secret>', methods=['POST'])
+bp.add_route(ingest_jobs, '/ingest', methods=['GET'])
+bp.add_route(ingest_job, '/ingest/<job_id>', methods=['GET'])
+bp.add_route(cache_stats, '/cache', methods=['GET'])
 bp.add_route(create_endpoint, '/create_db', methods=['GET'])
 bp.add_route(drop_endpoint, '/drop_db', methods=['GET'])
 bp.add_route(data_endpoint, '/data', methods=['GET'])
+bp.add_route(export_endpoint, '/export', methods=['GET'])
+bp.add_route(totals_endpoint, '/totals', methods=['GET'])
 bp.add_route(get_data_for_defined_period_endpoint, '/data_def_period', methods=['GET'])
 bp.add_route(get_data_for_custom_period_endpoint, '/data_custom_period', methods=['GET'])
 bp.add_route(set_limit, '/limit', methods=['PUT', 'POST'])
@@ -1,6 +1,40 @@
 from sanic import Sanic
+from database import helpers
+from database.data_version import data_version
+from telegram_bot.bot_handlers import bot
 from .api_v1 import bp
+from .ingest_queue import ingest_queue
 
 
 app = Sanic()
 app.blueprint(bp)
+
+
+@app.listener('before_server_start')
+async def open_db_pool(app, loop):
+    '''Opens shared database pool for the worker.'''
+    await helpers.init_engine()
+
+
+@app.listener('after_server_start')
+async def start_ingest_worker(app, loop):
+    '''Starts background ingest worker and data version listener of the worker process.'''
+    ingest_queue.start()
+    data_version.start(helpers.dsn)
+
+
+@app.listener('before_server_stop')
+async def stop_ingest_worker(app, loop):
+    '''
+    Stops background ingest worker and data version listener and waits for telegram bot handlers
+    of webhook updates before database pool is closed.
+    '''
+    await bot.join()
+    await data_version.stop()
+    await ingest_queue.stop()
+
+
+@app.listener('after_server_stop')
+async def close_db_pool(app, loop):
+    '''Closes shared database pool of the worker.'''
+    await helpers.close_engine()
@@ -0,0 +1,204 @@
+import asyncio
+from uuid import uuid4
+from datetime import datetime
+from collections import OrderedDict
+
+from config import dropbox, path, ingest
+from transport.data_provider import DataProvider
+from database import helpers
+from processor import importer
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+# key of PostgreSQL advisory lock which allows only one ingest at a time between all workers
+INGEST_LOCK_KEY = 1836019301
+
+
+class IngestJob(object):
+    '''
+    This is IngestJob class. It keeps state of Dropbox download and ingest
+    for one or more merged webhook notifications.
+    '''
+    def __init__(self):
+        self.id = uuid4().hex
+        self.state = QUEUED
+        self.created = datetime.utcnow()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.error = None
+        self.notifications = 1
+        self.runs = 0
+        self.dirty = False
+
+    def to_dict(self) -> dict:
+        return {
+            'id': self.id,
+            'state': self.state,
+            'created': self.created.isoformat(),
+            'started': self.started.isoformat() if self.started else None,
+            'finished': self.finished.isoformat() if self.finished else None,
+            'result': self.result,
+            'error': self.error,
+            'notifications': self.notifications,
+            'runs': self.runs,
+            'dirty': self.dirty
+        }
+
+
+class IngestQueue(object):
+    '''
+    This is IngestQueue class. Jobs are put on in-process asyncio queue and run one by one
+    by a background worker task. Dropbox download runs in the default executor.
+
+    Notifications are coalesced: while a job waits in the queue or for the end of debounce window,
+    new notifications are merged into it; while a job is running, they mark it dirty and the job
+    runs once more after the current run. Between processes ingest is serialized with
+    PostgreSQL advisory lock.
+    Methods:
+        start
+        stop
+        put
+        get
+        jobs
+    '''
+    def __init__(self, history_size=100, debounce=0):
+        '''
+        :param int history_size: number of the latest jobs which states are kept.
+        :param float debounce: number of seconds to wait for more notifications before job starts.
+        '''
+        self._history_size = history_size
+        self._debounce = debounce
+        self._jobs = OrderedDict()
+        self._queue = None
+        self._worker = None
+        self._stopping = False
+
+    def start(self) -> None:
+        '''
+        This method starts background worker on the running event loop.
+
+        :rtype: None
+        '''
+        self._queue = asyncio.Queue()
+        self._stopping = False
+        self._worker = asyncio.ensure_future(self._work())
+        for job in self._jobs.values():
+            if job.state == QUEUED:
+                self._queue.put_nowait(job)
+
+    async def stop(self) -> None:
+        '''
+        This method cancels background worker and waits for it. Queued jobs and the cancelled job stay queued.
+
+        :rtype: None
+        '''
+        if self._worker is not None:
+            self._stopping = True
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def put(self) -> IngestJob:
+        '''
+        This method puts new ingest job on the queue. If there is a queued job, notification
+        is merged into it, if there is a running job, it is marked dirty and returned.
+
+        :return IngestJob: queued or running job which will handle the notification.
+        '''
+        for job in self._jobs.values():
+            if job.state == QUEUED:
+                job.notifications += 1
+                return job
+            if job.state == RUNNING:
+                job.notifications += 1
+                job.dirty = True
+                return job
+
+        job = IngestJob()
+        self._jobs[job.id] = job
+        while len(self._jobs) > self._history_size:
+            self._jobs.popitem(last=False)
+        if self._queue is not None:
+            self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> IngestJob or None:
+        '''
+        This method returns job by id.
+
+        :param str job_id: id of the job.
+        :return IngestJob: job or None if job is unknown.
+        '''
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list:
+        '''
+        This method returns known jobs from the newest to the oldest.
+
+        :return list: list of IngestJob objects.
+        '''
+        return list(reversed(self._jobs.values()))
+
+    async def _work(self) -> None:
+        # aiopg 0.13 raises OperationalError instead of CancelledError if it is cancelled
+        # while it connects, so the worker also checks the flag after every job
+        while not self._stopping:
+            job = await self._queue.get()
+            if job.state == QUEUED:
+                if self._debounce:
+                    await asyncio.sleep(self._debounce)
+                await self._run(job)
+
+    async def _run(self, job: IngestJob) -> None:
+        job.state = RUNNING
+        job.started = datetime.utcnow()
+        try:
+            while True:
+                job.dirty = False
+                job.runs += 1
+                async with helpers.AdvisoryLock(INGEST_LOCK_KEY):
+                    job.result = await run_ingest()
+                if not job.dirty:
+                    break
+            job.state = DONE
+        except asyncio.CancelledError:
+            job.state = QUEUED
+            raise
+        except Exception as error:
+            if self._stopping:
+                job.state = QUEUED
+                return
+            job.error = '{}: {}'.format(type(error).__name__, error)
+            job.state = FAILED
+        finally:
+            job.finished = datetime.utcnow()
+
+
+async def run_ingest() -> dict:
+    '''
+    Downloads the newest Monefy data from Dropbox in the default executor and imports it.
+    The file is marked imported only after successful import, so if the import fails,
+    the file is imported again on the next notification without new download.
+
+    :return dict: result of the import or {'message': 'not modified'}.
+    '''
+    loop = asyncio.get_event_loop()
+    provider = DataProvider(dropbox['token'], path)
+    downloaded = await loop.run_in_executor(None, provider.get_newest_monefy_data)
+    if not downloaded:
+        return {'message': 'not modified'}
+    result = await importer.import_file(provider.download_path)
+    await loop.run_in_executor(None, provider.mark_imported)
+    if result is None:
+        return {'message': 'not modified'}
+    return dict(message='updated', **result)
+
+
+ingest_queue = IngestQueue(history_size=ingest['jobs_history'], debounce=ingest['debounce'])
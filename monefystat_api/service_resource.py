@@ -1,11 +1,51 @@
+import asyncio
+import base64
+import binascii
 import datetime
+import hmac
+from functools import wraps
+from json import dumps as json_dumps, loads as json_loads
 from sanic.exceptions import abort
-from sanic.response import json, text
+from sanic.response import json, text, stream, HTTPResponse, json_dumps as row_dumps
 from sanic.request import RequestParameters
-from config import dropbox, path
-from transport.data_provider import DataProvider
+from telebot.types import Update
+from config import api, telegram
 from database import helpers
-from processor import validator_data, mapper
+from database.data_version import data_version
+from monefystat_api.ingest_queue import ingest_queue
+from telegram_bot.bot_handlers import bot
+
+EXPORT_WRITE_BUFFER_LIMIT = 1024 * 1024
+
+
+def conditional(handler):
+    '''
+    Decorator of read endpoints which depend only on data version and current date.
+    Successful responses get ETag, request with matching If-None-Match gets 304 before handler runs,
+    so no SQL is executed. ETag is used only while data version listener is connected,
+    otherwise changes made by other processes would not change it.
+    '''
+    @wraps(handler)
+    async def wrapper(request, *args, **kwargs):
+        if not data_version.listening:
+            return await handler(request, *args, **kwargs)
+        etag = '"{}-{}-{}"'.format(data_version.epoch, data_version.value, datetime.date.today().isoformat())
+        if _etag_matches(etag, request.headers.get('If-None-Match')):
+            return HTTPResponse(status=304, headers={'ETag': etag})
+        response = await handler(request, *args, **kwargs)
+        if response.status == 200:
+            response.headers['ETag'] = etag
+        return response
+
+    return wrapper
+
+
+def _etag_matches(etag, if_none_match):
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    # weak comparison, W/ prefix could be added by proxies
+    return '*' in tags or etag in [tag[2:] if tag.startswith('W/') else tag for tag in tags]
 
 
 async def smoke_endpoint(request):
@@ -19,14 +59,50 @@ async def webhook_enable(request):
     return text(args['challenge'][0])
 
 
-# endpoint for downloading file from dropbox
+# endpoint for Dropbox webhook notifications, download and ingest run by background worker
 async def webhook_reciver(request):
-    obj = DataProvider(dropbox['token'], path)
-    obj.get_newest_monefy_data()
-    data = validator_data.validate_data(obj.download_path)
-    if data:
-        await mapper.insert_transactions(data)
-    return json({'message': 'updated'}, status=200)
+    job = ingest_queue.put()
+    return json({'message': 'queued', 'job': job.to_dict()}, status=202)
+
+
+# endpoint for Telegram bot updates in webhook mode, the update is handled in background by the bot
+async def telegram_webhook(request, secret):
+    if telegram['mode'] != 'webhook' or not _secret_matches(secret, telegram['webhook_secret']):
+        return json({'message': 'not found'}, status=404)
+    # Sanic answers 400 itself if body is not JSON, empty body is None
+    update = request.json
+    if not isinstance(update, dict) or 'update_id' not in update:
+        return json({'message': 'bad request body'}, status=400)
+    bot.process_update(Update.de_json(update))
+    return json({'message': 'ok'})
+
+
+def _secret_matches(secret, expected):
+    # constant time comparison, so the secret can't be guessed by response time
+    return bool(expected) and hmac.compare_digest(secret.encode('utf8'), expected.encode('utf8'))
+
+
+async def ingest_jobs(request):
+    '''Returns states of the latest ingest jobs'''
+    return json([job.to_dict() for job in ingest_queue.jobs()])
+
+
+async def ingest_job(request, job_id):
+    '''Returns state of the ingest job'''
+    job = ingest_queue.get(job_id)
+    if job:
+        return json(job.to_dict())
+    else:
+        return json({'message': 'job doesnt exist'}, status=404)
+
+
+async def cache_stats(request):
+    '''Returns hit and miss counters of response caches'''
+    return json({
+        'data_version': data_version.value,
+        'data_version_listening': data_version.listening,
+        'data_period': helpers.data_period_cache.stats()
+    })
 
 
 async def create_endpoint(request):
@@ -39,11 +115,101 @@ async def drop_endpoint(request):
     return json({'message': 'DB droped'})
 
 
+@conditional
 async def data_endpoint(request):
-    data = await helpers.get_all_data()
+    '''
+    Returns one page of transactions ordered by date and id.
+    Query args: limit, cursor (next_cursor of previous page), category, start_date and end_date (dd-mm-yyyy).
+    '''
+    try:
+        limit = int(request.args.get('limit', api['page_size']))
+        after = _decode_cursor(request.args.get('cursor'))
+        start_date = _parse_date(request.args.get('start_date'))
+        end_date = _parse_date(request.args.get('end_date'))
+    except ValueError:
+        return json({'message': 'bad request args'}, status=400)
+    if limit <= 0:
+        return json({'message': 'bad request args'}, status=400)
+
+    limit = min(limit, api['max_page_size'])
+    data = await helpers.get_data_page(limit + 1, after=after, category_name=request.args.get('category'),
+                                       start_date=start_date, end_date=end_date)
+    next_cursor = None
+    if len(data) > limit:
+        data = data[:limit]
+        next_cursor = _encode_cursor(data[-1]['transaction_date'], data[-1]['id'])
+    return json({'data': data, 'next_cursor': next_cursor})
+
+
+@conditional
+async def totals_endpoint(request):
+    '''
+    Returns totals of transactions by category and time bucket.
+    Query args: start_date and end_date (dd-mm-yyyy), bucket (day, week, month or year), category.
+    '''
+    try:
+        start_date = _parse_date(request.args['start_date'][0])
+        end_date = _parse_date(request.args['end_date'][0])
+    except KeyError:
+        return json({'message': 'start_date and end_date are not specified'}, status=400)
+    except ValueError:
+        return json({'message': 'bad request args'}, status=400)
+    bucket = request.args.get('bucket', 'month')
+    if bucket not in helpers.TOTALS_BUCKETS:
+        return json({'message': 'bad request args'}, status=400)
+    if start_date > end_date:
+        start_date, end_date = end_date, start_date
+
+    data = await helpers.get_totals(start_date, end_date, bucket=bucket, category_name=request.args.get('category'))
     return json(data)
 
 
+async def export_endpoint(request):
+    '''Streams all transactions as NDJSON, one JSON object per line'''
+    async def write_rows(response):
+        async for rows in helpers.iter_all_data(batch_size=api['export_batch_size']):
+            response.write(''.join(row_dumps(row) + '\n' for row in rows))
+            await _drain(response)
+
+    return stream(write_rows, content_type='application/x-ndjson')
+
+
+async def _drain(response):
+    '''Waits while client reads written data, so slow client doesnt make write buffer grow'''
+    while response.transport.get_write_buffer_size() > EXPORT_WRITE_BUFFER_LIMIT:
+        if response.transport.is_closing():
+            raise ConnectionError('client disconnected')
+        await asyncio.sleep(0.01)
+
+
+def _encode_cursor(transaction_date, transaction_id):
+    '''Encodes position of the row as opaque cursor'''
+    position = json_dumps([transaction_date.isoformat(), transaction_id])
+    return base64.urlsafe_b64encode(position.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    '''
+    Decodes cursor made by _encode_cursor.
+
+    :return tuple: (transaction_date, id) or None if cursor is not specified.
+    :raises: ValueError
+    '''
+    if not cursor:
+        return None
+    try:
+        transaction_date, transaction_id = json_loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        return datetime.datetime.strptime(transaction_date, '%Y-%m-%d').date(), int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError):
+        raise ValueError('invalid cursor')
+
+
+def _parse_date(value):
+    if value is None:
+        return None
+    return datetime.datetime.strptime(value, '%d-%m-%Y').date()
+
+
 def _convert_limit_args(args):
     additional_fields = ['category_name', 'limit', 'start_date', 'period', 'is_repeated']
     if set(args.keys()) == set(additional_fields):
@@ -80,6 +246,7 @@ async def set_limit(request):
         return json({'message': 'bad request args'}, status=400)
 
 
+@conditional
 async def get_limit(request):
     '''Selects category info from database'''
     data = await helpers.get_limit(request.args.get('category_name'))
@@ -101,6 +268,7 @@ async def clear_limit(request):
         return json({'message': 'category is not exists'}, status=404)
 
 
+@conditional
 async def get_data_for_defined_period_endpoint(request):
     try:
         category = request.args['category'][0]
@@ -111,6 +279,7 @@ async def get_data_for_defined_period_endpoint(request):
     return json(data)
 
 
+@conditional
 async def get_data_for_custom_period_endpoint(request):
     try:
         category = request.args['category'][0]
@@ -0,0 +1,38 @@
+from hashlib import md5, sha256
+
+
+def file_fingerprint(file_csv, chunk_size=65536) -> str:
+    '''
+    This method calculates hash of the whole file.
+
+    :param .csv file_csv: path to file Monefy_data.csv
+    :param int chunk_size: number of bytes read at once.
+    '''
+    file_hash = sha256()
+    with open(file_csv, 'rb') as csvfile:
+        for chunk in iter(lambda: csvfile.read(chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def row_key(row: list) -> str:
+    '''
+    This method calculates hash of the fields which identify transaction
+    (the same fields as `identity_hash` of Transaction model).
+
+    :param row: list of converted data of the csv row.
+    '''
+    return _hash_fields((row[0], row[1], abs(row[3]), row[7]))
+
+
+def row_fingerprint(row: list) -> str:
+    '''
+    This method calculates hash of all fields of the converted csv row.
+
+    :param row: list of converted data of the csv row.
+    '''
+    return _hash_fields(row)
+
+
+def _hash_fields(fields) -> str:
+    return md5('\x1f'.join(str(field) for field in fields).encode('utf8')).hexdigest()
@@ -0,0 +1,80 @@
+import asyncio
+
+from database import helpers
+from processor import validator_data, mapper, fingerprint
+from config import ingest
+
+FILE_FINGERPRINT = 'file_fingerprint'
+
+
+async def import_file(file_csv) -> dict or None:
+    '''
+    Imports Monefy_data.csv to database applying only rows which are new or changed
+    since the last import. Fingerprints of the file and of the rows are saved after
+    successful import.
+
+    The file is streamed twice: the first pass compares fingerprints of the rows chunk by chunk
+    with saved ones and keeps only fingerprints of changed rows, the second pass streams
+    changed rows to `mapper.ingest_transactions`. Rows are never kept in memory all at once.
+    Hashing and parsing of the file run in the default executor, not on the event loop.
+
+    :param .csv file_csv: path to file Monefy_data.csv
+    :return dict: numbers of inserted, updated and unchanged rows, None if the file is not changed.
+    :raises: ValidationError
+    '''
+    loop = asyncio.get_event_loop()
+    file_hash = await loop.run_in_executor(None, fingerprint.file_fingerprint, file_csv)
+    if file_hash == await helpers.get_import_state(FILE_FINGERPRINT):
+        return None
+
+    changed = {}
+    total = 0
+    chunks = _iter_chunk_fingerprints(file_csv)
+    while True:
+        chunk = await loop.run_in_executor(None, next, chunks, None)
+        if chunk is None:
+            break
+        count, fingerprints = chunk
+        total += count
+
+        imported = await helpers.get_row_fingerprints(list(fingerprints.keys()))
+        for key, row_fingerprint in fingerprints.items():
+            # the last row with the same key wins, like in mapper
+            changed.pop(key, None)
+            if imported.get(key) != row_fingerprint:
+                changed[key] = row_fingerprint
+
+    result = {'inserted': 0, 'updated': 0}
+    if changed:
+        result = await mapper.ingest_transactions(_iter_changed_rows(file_csv, changed))
+        await helpers.upsert_row_fingerprints(changed, batch_size=ingest['batch_size'])
+    await helpers.set_import_state(FILE_FINGERPRINT, file_hash)
+    result['unchanged'] = total - result['inserted'] - result['updated']
+    return result
+
+
+def _iter_chunk_fingerprints(file_csv) -> iter:
+    '''
+    Yields number of rows and fingerprints of rows by row keys, chunk by chunk.
+
+    :param .csv file_csv: path to file Monefy_data.csv
+    '''
+    for chunk in validator_data.iter_validate_data(file_csv, chunk_size=ingest['batch_size']):
+        fingerprints = {}
+        for row in chunk:
+            key = fingerprint.row_key(row)
+            fingerprints.pop(key, None)
+            fingerprints[key] = fingerprint.row_fingerprint(row)
+        yield len(chunk), fingerprints
+
+
+def _iter_changed_rows(file_csv, changed: dict) -> iter:
+    '''
+    Yields rows of the file which fingerprints are in `changed`.
+
+    :param .csv file_csv: path to file Monefy_data.csv
+    :param dict changed: fingerprints of changed rows by row keys.
+    '''
+    for row in validator_data.iter_validate_data(file_csv):
+        if changed.get(fingerprint.row_key(row)) == fingerprint.row_fingerprint(row):
+            yield row
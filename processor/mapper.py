@@ -1,54 +1,142 @@
+import io
+import csv
+import asyncio
+from uuid import UUID
+from struct import Struct
+from hashlib import md5
+from datetime import date, datetime
+from itertools import islice, chain
+
+import psycopg2
 from sqlalchemy.dialects.postgresql import insert
-from sqlalchemy.sql import select
+from sqlalchemy.sql import select, literal_column
 from database.models import Transaction, Category
-from database.helpers import _create_engine
+from database.helpers import get_engine, dsn, refresh_daily_totals, notify_data_changed, REFRESH_DAILY_TOTALS
+from database.category_cache import category_cache
+from config import ingest
+
+POSTGRES_EPOCH = date(2000, 1, 1)
+
+IDENTITY_PREFIX = Struct('>id')
+
+STAGING_COLUMNS = (
+    'line',
+    'transaction_date',
+    'account',
+    'category',
+    'amount',
+    'currency',
+    'converted_amount',
+    'converted_currency',
+    'description',
+    'is_debet'
+)
+
+STAGING_DATES = 'select coalesce(array_agg(distinct transaction_date), array[]::date[]) from transaction_staging'
+
+COPY_STAGING = 'copy transaction_staging ({}) from stdin with (format csv)'.format(', '.join(STAGING_COLUMNS))
+
+MERGE_CATEGORIES = '''
+    insert into category (timestamp, title)
+    select distinct %(timestamp)s, category from transaction_staging
+    on conflict (title) do nothing
+'''
+
+MERGE_TRANSACTIONS = '''
+    with merged as (
+        insert into transaction (timestamp, transaction_date, account, category, amount, currency,
+                                 converted_amount, converted_currency, description, is_debet, identity_hash)
+        select distinct on (identity_hash)
+            %(timestamp)s, s.transaction_date, s.account, c.id, s.amount, s.currency,
+            s.converted_amount, s.converted_currency, s.description, s.is_debet,
+            transaction_identity(s.transaction_date, s.account, s.amount, s.description) as identity_hash
+        from transaction_staging s
+        join category c on c.title = s.category
+        order by identity_hash, s.line desc
+        on conflict on constraint tr_identity do update set
+            category = excluded.category,
+            currency = excluded.currency,
+            converted_amount = excluded.converted_amount,
+            converted_currency = excluded.converted_currency,
+            is_debet = excluded.is_debet
+        returning xmax = 0 as inserted
+    )
+    select count(*) filter (where inserted), count(*) filter (where not inserted) from merged
+'''
+
+
+async def ingest_transactions(transactions) -> dict:
+    '''
+    Inserts prepared data to database with the ingest engine which suits the number of rows:
+    `copy_insert_transactions` from `config.ingest['copy_threshold']` rows, `bulk_insert_transactions` below it.
+    Rows can be streamed, only first `copy_threshold` rows are read ahead in the default executor
+    to choose the engine.
+
+    :param transactions: list or iterable of lists of converted data from csv file.
+    :return dict: numbers of inserted and updated rows, like {'inserted': int, 'updated': int}.
+    '''
+    transactions = iter(transactions)
+    loop = asyncio.get_event_loop()
+    head = await loop.run_in_executor(None, list, islice(transactions, ingest['copy_threshold']))
+    if len(head) < ingest['copy_threshold']:
+        return await bulk_insert_transactions(head)
+    return await copy_insert_transactions(chain(head, transactions))
 
 
 async def insert_transactions(transactions: list) -> None:
     '''
-    Inserts prepared data to database.
+    Inserts prepared data to database and updates daily_category_totals for the touched dates.
     All data must correspond with Transaction model.
 
     :param transactions: list of lists of converted data from csv file.
     '''
-    engine = await _create_engine()
-    async with engine:
-        async with engine.acquire() as connection:
-            for transaction in transactions:
-                category = transaction[2].strip().lower()
-                category_id = await insert_select_category(category, connection)
-                insert_transaction = insert(Transaction).values(
-                    transaction_date=transaction[0],
-                    account=transaction[1],
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        for transaction in transactions:
+            category = transaction[2].strip().lower()
+            category_id = await insert_select_category(category, connection)
+            insert_transaction = insert(Transaction).values(
+                transaction_date=transaction[0],
+                account=transaction[1],
+                category=category_id,
+                amount=abs(transaction[3]),
+                currency=transaction[4],
+                converted_amount=abs(transaction[5]),
+                converted_currency=transaction[6],
+                description=transaction[7],
+                is_debet=(transaction[3] > 0),
+                identity_hash=_identity_hash(transaction[0], transaction[1], abs(transaction[3]), transaction[7])
+            )
+            on_update_transaction = insert_transaction.on_conflict_do_update(
+                constraint='tr_identity',
+                set_=dict(
                     category=category_id,
-                    amount=abs(transaction[3]),
                     currency=transaction[4],
                     converted_amount=abs(transaction[5]),
                     converted_currency=transaction[6],
-                    description=transaction[7],
                     is_debet=(transaction[3] > 0)
                 )
-                on_update_transaction = insert_transaction.on_conflict_do_update(
-                    constraint='tr_constraint',
-                    set_=dict(
-                        category=category_id,
-                        currency=transaction[4],
-                        converted_amount=abs(transaction[5]),
-                        converted_currency=transaction[6],
-                        is_debet=(transaction[3] > 0)
-                    )
-                )
-                await connection.execute(on_update_transaction)
+            )
+            await connection.execute(on_update_transaction)
+        # statements above are autocommitted, but delete and insert of rollup rows must be seen at once
+        async with connection.begin():
+            await refresh_daily_totals({transaction[0] for transaction in transactions}, connection)
+    await notify_data_changed()
 
 
 async def insert_select_category(category: str, connection: object) -> int:
     '''
-    Check that category exists in the db table.
-    If not - insert category to bd.
+    Check that category exists in the category cache or in the db table.
+    If not - insert category to bd. Connection must not be in explicit transaction,
+    inserted category is cached at once.
 
     :param category: the name of the category.
     :param connection: connection object.
     '''
+    category_id = category_cache.get(category)
+    if category_id is not None:
+        return category_id
+
     insert_category = insert(Category).values(
         title=category
     )
@@ -57,12 +145,12 @@ async def insert_select_category(category: str, connection: object) -> int:
     )
     res = await connection.execute(do_nothing_category)
     row = await res.first()
-    if not row:
-        return await get_category_id(category, connection)
-    return row['id']
+    category_id = row['id'] if row else await select_category_id(category, connection)
+    category_cache.add(category, category_id)
+    return category_id
 
 
-async def get_category_id(category: str, connection: object) -> int:
+async def select_category_id(category: str, connection: object) -> int:
     '''
     Get id from db table by the title.
 
@@ -73,3 +161,229 @@ async def get_category_id(category: str, connection: object) -> int:
     out = await connection.execute(res)
     row = await out.first()
     return row['id']
+
+
+async def bulk_insert_transactions(transactions, batch_size=None) -> dict:
+    '''
+    Inserts prepared data to database with multi-row statements inside one database transaction.
+    daily_category_totals is updated for the touched dates in the same transaction.
+    All data must correspond with Transaction model.
+    Rows with the same identity fields are merged, the last one wins as in `insert_transactions`.
+
+    :param transactions: list or iterable of lists of converted data from csv file.
+    :param int batch_size: number of rows in one INSERT statement, `config.ingest['batch_size']` by default.
+    :return dict: numbers of inserted and updated rows, like {'inserted': int, 'updated': int}.
+    '''
+    batch_size = batch_size or ingest['batch_size']
+    rows, titles = _unique_transactions(transactions)
+    result = {'inserted': 0, 'updated': 0}
+    if not rows:
+        return result
+
+    engine = await get_engine()
+    async with engine.acquire() as connection:
+        async with connection.begin():
+            categories = await insert_select_categories(titles, connection)
+            for start in range(0, len(rows), batch_size):
+                batch = [
+                    dict(row, category=categories[row['category']], identity_hash=_identity_hash(
+                        row['transaction_date'], row['account'], row['amount'], row['description']))
+                    for row in rows[start:start + batch_size]
+                ]
+                inserted, updated = await _upsert_batch(batch, connection)
+                result['inserted'] += inserted
+                result['updated'] += updated
+            await refresh_daily_totals({row['transaction_date'] for row in rows}, connection)
+        # ids of inserted categories are cached only after commit
+        category_cache.update(categories)
+    await notify_data_changed()
+    return result
+
+
+async def _upsert_batch(batch: list, connection: object, constraint='tr_identity') -> tuple:
+    '''
+    Upserts rows of Transaction values with one multi-row statement.
+
+    :param list batch: list of dictionaries with Transaction values.
+    :param connection: connection object.
+    :param str constraint: unique constraint which detects existing rows.
+    :return tuple: numbers of inserted and updated rows.
+    '''
+    insert_transaction = insert(Transaction).values(batch)
+    on_update_transaction = insert_transaction.on_conflict_do_update(
+        constraint=constraint,
+        set_=dict(
+            category=insert_transaction.excluded.category,
+            currency=insert_transaction.excluded.currency,
+            converted_amount=insert_transaction.excluded.converted_amount,
+            converted_currency=insert_transaction.excluded.converted_currency,
+            is_debet=insert_transaction.excluded.is_debet
+        )
+    ).returning(literal_column('xmax = 0').label('inserted'))
+    res = await connection.execute(on_update_transaction)
+    inserted = sum(1 for row in await res.fetchall() if row['inserted'])
+    return inserted, len(batch) - inserted
+
+
+def _unique_transactions(transactions: list) -> tuple:
+    '''
+    Converts rows to Transaction values and merges rows with the same identity fields
+    (the fields hashed to `identity_hash`).
+    Multi-row upsert can not affect the same row twice, so only the last of such rows is kept.
+    Categories of all rows are returned, so merged rows create the same categories as in `insert_transactions`.
+
+    :param transactions: list of lists of converted data from csv file.
+    :return tuple: list of dictionaries with Transaction values, `category` contains category title,
+        and set of titles of categories of all rows.
+    '''
+    unique = {}
+    titles = set()
+    for transaction in transactions:
+        row = dict(
+            transaction_date=transaction[0],
+            account=transaction[1],
+            category=transaction[2].strip().lower(),
+            amount=abs(transaction[3]),
+            currency=transaction[4],
+            converted_amount=abs(transaction[5]),
+            converted_currency=transaction[6],
+            description=transaction[7],
+            is_debet=(transaction[3] > 0)
+        )
+        # transaction_identity() hashes NULL account and description as empty strings
+        key = (row['transaction_date'], row['account'] or '', row['amount'], row['description'] or '')
+        unique.pop(key, None)
+        unique[key] = row
+        titles.add(row['category'])
+    return list(unique.values()), titles
+
+
+def _identity_hash(transaction_date, account, amount, description) -> str:
+    '''
+    Returns `identity_hash` of the transaction. It is the same md5 as transaction_identity() SQL function
+    used in merge of staging table and in the migration which introduced it calculates: days since
+    2000-01-01 as int4 and amount as float8 in network byte order, then utf8 account, zero byte and
+    utf8 description. The hash is sent as bound parameter, so database does not call the function per row.
+    '''
+    digest = md5(IDENTITY_PREFIX.pack((transaction_date - POSTGRES_EPOCH).days, amount))
+    digest.update((account or '').encode('utf8'))
+    digest.update(b'\x00')
+    digest.update((description or '').encode('utf8'))
+    return str(UUID(bytes=digest.digest()))
+
+
+async def insert_select_categories(categories: set, connection: object) -> dict:
+    '''
+    Takes ids of cached categories from category cache, inserts missing categories
+    and selects ids of the rest with one statement. Returned ids are not cached,
+    the caller caches them when its transaction is committed.
+
+    :param categories: set of names of the categories.
+    :param connection: connection object.
+    :return dict: category ids by names.
+    '''
+    ids = {}
+    for category in categories:
+        category_id = category_cache.get(category)
+        if category_id is not None:
+            ids[category] = category_id
+    categories = [category for category in categories if category not in ids]
+    if not categories:
+        return ids
+    inserted = insert(Category).values(
+        [dict(title=category) for category in categories]
+    ).on_conflict_do_nothing(
+        index_elements=['title']
+    ).returning(Category.id, Category.title).cte('inserted')
+    query = select([inserted.c.id, inserted.c.title]).union_all(
+        select([Category.id, Category.title]).where(Category.title.in_(categories))
+    )
+    res = await connection.execute(query)
+    ids.update((row['title'], row['id']) for row in await res.fetchall())
+    return ids
+
+
+async def copy_insert_transactions(transactions) -> dict:
+    '''
+    Inserts prepared data to database through COPY into unlogged `transaction_staging` table
+    and one INSERT ... SELECT ... ON CONFLICT merge into `category` and `transaction` tables.
+    Asynchronous connections do not support COPY, so the work is done by a separate psycopg2
+    connection in the default executor.
+
+    :param transactions: list or iterable of lists of converted data from csv file.
+    :return dict: numbers of inserted and updated rows, like {'inserted': int, 'updated': int}.
+    '''
+    loop = asyncio.get_event_loop()
+    result = await loop.run_in_executor(None, _copy_transactions, transactions)
+    # categories could be added by merge of staging table
+    category_cache.invalidate()
+    await notify_data_changed()
+    return result
+
+
+def _copy_transactions(transactions) -> dict:
+    '''
+    Streams transactions to staging table and merges them in one database transaction
+    with update of daily_category_totals for the dates of the staged rows.
+
+    :param transactions: iterable of lists of converted data from csv file.
+    :return dict: numbers of inserted and updated rows.
+    '''
+    timestamp = datetime.utcnow()
+    connection = psycopg2.connect(dsn)
+    try:
+        with connection:
+            with connection.cursor() as cursor:
+                cursor.execute('truncate transaction_staging')
+                cursor.copy_expert(COPY_STAGING, _StagingFile(transactions))
+                cursor.execute(MERGE_CATEGORIES, {'timestamp': timestamp})
+                cursor.execute(MERGE_TRANSACTIONS, {'timestamp': timestamp})
+                inserted, updated = cursor.fetchone()
+                cursor.execute(STAGING_DATES)
+                dates = {'dates': cursor.fetchone()[0]}
+                for query in REFRESH_DAILY_TOTALS:
+                    cursor.execute(query, dates)
+    finally:
+        connection.close()
+    return {'inserted': inserted, 'updated': updated}
+
+
+class _StagingFile(object):
+    '''
+    File-like object for COPY which renders transactions to csv lines only when they are read.
+    '''
+    def __init__(self, transactions):
+        self._rows = self._staging_rows(transactions)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, quoting=csv.QUOTE_NONNUMERIC, lineterminator='\n')
+        self._pending = ''
+
+    @staticmethod
+    def _staging_rows(transactions):
+        for line, transaction in enumerate(transactions):
+            yield (
+                line,
+                transaction[0],
+                transaction[1],
+                transaction[2].strip().lower(),
+                abs(transaction[3]),
+                transaction[4],
+                abs(transaction[5]),
+                transaction[6],
+                transaction[7],
+                transaction[3] > 0
+            )
+
+    def read(self, size=-1) -> str:
+        while size < 0 or len(self._pending) < size:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            self._writer.writerow(row)
+            self._pending += self._buffer.getvalue()
+            self._buffer.seek(0)
+            self._buffer.truncate()
+        if size < 0:
+            size = len(self._pending)
+        chunk, self._pending = self._pending[:size], self._pending[size:]
+        return chunk
@@ -1,24 +1,169 @@
 import csv
+from array import array
+from functools import lru_cache
 from datetime import date, datetime
 
+# characters removed from every cell by `convert_row` and additionally from amounts by `replace_symbol_from_amount`
+CELL_TRANSLATION = str.maketrans('', '', ' \xa0')
+AMOUNT_TRANSLATION = str.maketrans('', '', ' \xa0"')
+
 
 class ValidationError(Exception):
     pass
 
 
-def validate_data(file_csv) -> list:
+def validate_data(file_csv, columnar=False) -> list:
     '''
     This method validate Monefy_data.csv and typing data from Monefy_data.csv
     The file that is called by this function is stored in the following way:
     '/downloads/Monefy_data.csv'
 
     :param .csv file_csv: path to file Monefy_data.csv
+    :param bool columnar: if True, ColumnarData object is returned instead of list of rows.
+    '''
+    if columnar:
+        data = ColumnarData()
+        for row in iter_validate_data(file_csv):
+            data.append(row)
+        return data
+    return list(iter_validate_data(file_csv))
+
+
+def iter_validate_data(file_csv, chunk_size=None) -> iter:
+    '''
+    This method validate Monefy_data.csv like `validate_data`, but yields typed rows
+    one by one straight from the csv reader, so the file is never kept in memory.
+
+    :param .csv file_csv: path to file Monefy_data.csv
+    :param int chunk_size: if specified, lists of up to `chunk_size` rows are yielded instead of rows.
+    :raises: ValidationError
     '''
-    result = []
-    rows = read_from_file(file_csv)
+    rows = map(fast_convert_row, _open_rows(file_csv))
+    if chunk_size:
+        return _iter_chunks(rows, chunk_size)
+    return rows
+
+
+def _iter_chunks(rows, chunk_size: int) -> iter:
+    chunk = []
     for row in rows:
-        result.append(convert_type(row))
-    return result
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class DictionaryColumn(object):
+    '''
+    Column of repeated strings stored as integer codes and lookup table of distinct values.
+    '''
+    __slots__ = ('codes', 'values', '_index')
+
+    def __init__(self):
+        self.codes = array('I')
+        self.values = []
+        self._index = {}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        return self.values[self.codes[index]]
+
+    def append(self, value: str) -> None:
+        code = self._index.get(value)
+        if code is None:
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+
+class ColumnarData(object):
+    '''
+    Validated data of Monefy_data.csv stored by columns:
+    dates as ordinal integers, amounts as arrays of doubles and
+    strings as DictionaryColumn objects.
+    Iteration yields rows in the same format as `validate_data` returns.
+    '''
+    __slots__ = (
+        'dates',
+        'accounts',
+        'categories',
+        'amounts',
+        'currencies',
+        'converted_amounts',
+        'converted_currencies',
+        'descriptions'
+    )
+
+    def __init__(self):
+        self.dates = array('i')
+        self.accounts = DictionaryColumn()
+        self.categories = DictionaryColumn()
+        self.amounts = array('d')
+        self.currencies = DictionaryColumn()
+        self.converted_amounts = array('d')
+        self.converted_currencies = DictionaryColumn()
+        self.descriptions = DictionaryColumn()
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __iter__(self):
+        for index in range(len(self.dates)):
+            yield self.row(index)
+
+    def append(self, row: list) -> None:
+        '''
+        This method append typed row to the columns.
+
+        :param row: the converted line of the csv file
+        '''
+        self.dates.append(row[0].toordinal())
+        self.accounts.append(row[1])
+        self.categories.append(row[2])
+        self.amounts.append(row[3])
+        self.currencies.append(row[4])
+        self.converted_amounts.append(row[5])
+        self.converted_currencies.append(row[6])
+        self.descriptions.append(row[7])
+
+    def row(self, index: int) -> list:
+        '''
+        This method build typed row with the given index.
+
+        :param int index: index of the row
+        '''
+        return [
+            date.fromordinal(self.dates[index]),
+            self.accounts[index],
+            self.categories[index],
+            self.amounts[index],
+            self.currencies[index],
+            self.converted_amounts[index],
+            self.converted_currencies[index],
+            self.descriptions[index]
+        ]
+
+    def sum_by_category(self, start_date=None, end_date=None, converted=False) -> dict:
+        '''
+        This method sum amounts of each category for the period without building rows.
+
+        :param date start_date: first day of the period, not limited if None.
+        :param date end_date: last day of the period, not limited if None.
+        :param bool converted: sum converted amounts instead of amounts.
+        :return dict: sums of amounts by category names.
+        '''
+        start = start_date.toordinal() if start_date else None
+        end = end_date.toordinal() if end_date else None
+        amounts = self.converted_amounts if converted else self.amounts
+        sums = [0.0] * len(self.categories.values)
+        for day, code, amount in zip(self.dates, self.categories.codes, amounts):
+            if (start is None or day >= start) and (end is None or day <= end):
+                sums[code] += amount
+        return dict(zip(self.categories.values, sums))
 
 
 def convert_type(row: list) -> list:
@@ -37,6 +182,42 @@ def convert_type(row: list) -> list:
     return row
 
 
+def fast_convert_row(row: list) -> list:
+    '''
+    This method clean and convert the csv row in one pass.
+    The result is the same as `convert_type(convert_row(row))`.
+
+    :param row: the line of the csv file
+    '''
+    result = [
+        _parse_date(row[0].translate(CELL_TRANSLATION)),
+        row[1].translate(CELL_TRANSLATION),
+        row[2].translate(CELL_TRANSLATION),
+        _parse_amount(row[3].translate(AMOUNT_TRANSLATION)),
+        row[4].translate(CELL_TRANSLATION),
+        _parse_amount(row[5].translate(AMOUNT_TRANSLATION)),
+        row[6].translate(CELL_TRANSLATION),
+        row[7].translate(CELL_TRANSLATION)
+    ]
+    if len(row) > 8:
+        result.extend(column.translate(CELL_TRANSLATION) for column in row[8:])
+    return result
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(column: str) -> date:
+    return datetime.strptime(column, '%d/%m/%Y').date()
+
+
+def _parse_amount(column: str) -> float:
+    # the same rules as in `replace_symbol_from_amount`: the last comma is a decimal
+    # separator if less than three digits follow it, other commas separate thousands
+    head, separator, tail = column.rpartition(',')
+    if separator and len(tail) < 3:
+        return float(head.replace(',', '') + '.' + tail)
+    return float(column.replace(',', ''))
+
+
 def replace_symbol_from_amount(column: str) -> str:
     '''
     This method replace special symbols to empty string.
@@ -54,6 +235,27 @@ def read_from_file(file_csv) -> list:
     '''
     This method read data from the csv file.
 
+    :param .csv file_csv: path to file Monefy_data.csv
+    :raises: ValidationError
+    '''
+    return list(iter_from_file(file_csv))
+
+
+def iter_from_file(file_csv) -> iter:
+    '''
+    This method read data from the csv file row by row.
+    Header of the file is validated before the first row is requested.
+
+    :param .csv file_csv: path to file Monefy_data.csv
+    :raises: ValidationError
+    '''
+    return (convert_row(row) for row in _open_rows(file_csv))
+
+
+def _open_rows(file_csv) -> iter:
+    '''
+    This method validate header of the csv file and return iterator over raw rows.
+
     :param .csv file_csv: path to file Monefy_data.csv
     :raises: ValidationError
     '''
@@ -67,19 +269,26 @@ def read_from_file(file_csv) -> list:
         'currency',
         'description'
     ]
-    result = []
-    with open(file_csv, 'r', encoding='utf8') as csvfile:
+    csvfile = open(file_csv, 'r', encoding='utf8')
+    try:
         header = csvfile.readline()
         delimiter = ',' if header.count(',') else ';'
 
         if header.strip() != delimiter.join(title_file):
             raise ValidationError('The content of the file is incorrect')
+    except Exception:
+        csvfile.close()
+        raise
 
+    return _iter_rows(csvfile, delimiter)
+
+
+def _iter_rows(csvfile, delimiter: str) -> iter:
+    with csvfile:
         rows = csv.reader(csvfile, delimiter=delimiter)
         for row in rows:
             if row:
-                result.append(convert_row(row))
-    return result
+                yield row
 
 
 def convert_row(row: list) -> list:
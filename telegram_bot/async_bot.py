@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from functools import partial
+from collections import deque
+
+import telebot
+from telebot import apihelper
+
+logger = logging.getLogger(__name__)
+
+
+def set_api_url(url: str) -> None:
+    '''
+    Sets URL of Telegram Bot API, e.g. fake Telegram for offline tests.
+    pyTelegramBotAPI 3.6.2 binds API_URL as the default argument of apihelper._make_request,
+    so the default argument is replaced.
+
+    :param str url: URL template with token and method placeholders like 'https://api.telegram.org/bot{0}/{1}'.
+    :rtype: None
+    '''
+    defaults = apihelper._make_request.__defaults__
+    apihelper._make_request.__defaults__ = defaults[:-1] + (url,)
+
+
+class AsyncBot(telebot.TeleBot):
+    '''
+    This is AsyncBot class. It runs handlers registered with `message_handler` and
+    `register_next_step_handler` of TeleBot as coroutines on asyncio event loop.
+    Messages of one chat are handled one by one in order of arrival, different chats are handled concurrently.
+    Requests to Telegram API are blocking, so they run in the default executor.
+    Methods:
+        send_message
+        process_update
+        process_message_handlers
+        clear_step_handler_by_chat_id
+        join
+        polling
+        stop_polling
+    '''
+    def __init__(self, token: str):
+        '''
+        :param str token: token of the bot.
+        '''
+        super().__init__(token, threaded=False)
+        self._chats = {}
+        self._polling = False
+
+    async def send_message(self, chat_id, text, **kwargs):
+        '''
+        This method sends text message in the default executor.
+
+        :param chat_id: id of the chat.
+        :param str text: text of the message.
+        :return: sent Message object.
+        '''
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, partial(super().send_message, chat_id, text, **kwargs))
+
+    def process_update(self, update) -> None:
+        '''
+        This method schedules handling of message of the update on the running event loop.
+        Updates without message are ignored.
+
+        :param update: Update object.
+        :rtype: None
+        '''
+        if update.update_id > self.last_update_id:
+            self.last_update_id = update.update_id
+        message = update.message
+        if message is None:
+            return
+        pending = self._chats.get(message.chat.id)
+        if pending is not None:
+            pending.append(message)
+            return
+        self._chats[message.chat.id] = deque([message])
+        asyncio.ensure_future(self._process_chat(message.chat.id))
+
+    async def join(self) -> None:
+        '''
+        This method waits until all scheduled messages are handled.
+
+        :rtype: None
+        '''
+        while self._chats:
+            await asyncio.sleep(0.01)
+
+    async def polling(self, timeout=20, retry_delay=3.0) -> None:
+        '''
+        This method receives updates with long polling until `stop_polling` is called.
+
+        :param int timeout: timeout of long polling request in seconds.
+        :param float retry_delay: number of seconds to wait after failed request.
+        :rtype: None
+        '''
+        loop = asyncio.get_event_loop()
+        self._polling = True
+        while self._polling:
+            try:
+                updates = await loop.run_in_executor(
+                    None, partial(self.get_updates, offset=self.last_update_id + 1, timeout=timeout))
+            except Exception:
+                logger.exception('Failed to get updates')
+                await asyncio.sleep(retry_delay)
+                continue
+            for update in updates:
+                self.process_update(update)
+
+    def stop_polling(self) -> None:
+        '''
+        This method stops polling after current request of updates.
+
+        :rtype: None
+        '''
+        self._polling = False
+
+    async def _process_chat(self, chat_id) -> None:
+        pending = self._chats[chat_id]
+        try:
+            while pending:
+                await self._process_message(pending[0])
+                pending.popleft()
+        finally:
+            del self._chats[chat_id]
+
+    async def process_message_handlers(self, message) -> None:
+        '''
+        This method runs the first handler registered with `message_handler` which matches the message.
+
+        :param message: Message object.
+        :rtype: None
+        '''
+        for message_handler in self.message_handlers:
+            if self._test_message_handler(message_handler, message):
+                await self._run_handler(message_handler['function'], message)
+                return
+
+    def clear_step_handler_by_chat_id(self, chat_id) -> None:
+        '''
+        This method drops next step handlers of the chat, the next message of the chat
+        is handled by handlers registered with `message_handler`.
+
+        :param chat_id: id of the chat.
+        :rtype: None
+        '''
+        self.pre_message_subscribers_next_step.pop(chat_id, None)
+
+    async def _process_message(self, message) -> None:
+        # next step handlers registered by handler of the previous message of the chat
+        handlers = self.pre_message_subscribers_next_step.pop(message.chat.id, None)
+        if not handlers:
+            await self.process_message_handlers(message)
+            return
+        for handler in handlers:
+            await self._run_handler(handler, message)
+
+    async def _run_handler(self, handler, message) -> None:
+        try:
+            await handler(message)
+        except Exception:
+            logger.exception('Handler %s failed', handler.__name__)
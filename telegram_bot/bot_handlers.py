@@ -1,17 +1,22 @@
 from datetime import datetime
+from functools import wraps
 
-import telebot
 from telebot.types import ReplyKeyboardMarkup, ReplyKeyboardRemove
 
 from telegram_bot import button_titles
+from telegram_bot.async_bot import AsyncBot, set_api_url
 from telegram_bot.telegram_calendar import TelegramCalendar
 from telegram_bot.limiter_helper import LimiterHelper
+from telegram_bot.session_store import SessionStore
 from config import telegram
 
 
-bot = telebot.TeleBot(telegram['token'], threaded=False)
-lhelper = LimiterHelper()
-tcalendar = TelegramCalendar()
+set_api_url(telegram['api_url'])
+bot = AsyncBot(telegram['token'])
+# next step handlers of abandoned flow are dropped with its session
+sessions = SessionStore(LimiterHelper, maxsize=telegram['sessions_size'], ttl=telegram['session_ttl'],
+                        on_evict=bot.clear_step_handler_by_chat_id)
+tcalendar = TelegramCalendar(cache_size=telegram['calendar_cache_size'], shown_dates_size=telegram['sessions_size'])
 
 
 commands = {  # command description used in the 'help' command
@@ -37,7 +42,7 @@ def start_user_markup() -> object:
 
 # Handle '/start'
 @bot.message_handler(commands=['start'])
-def send_welcome(message: object) -> None:
+async def send_welcome(message: object) -> None:
     '''
     Hendler for /start command.
     :param object message: message object.
@@ -46,12 +51,12 @@ def send_welcome(message: object) -> None:
     message_text = '🔵 Hi there, I am MonefystatBot. ' \
                    'I am here to help you to interact with Monefystat application. ' \
                    'Tap /help to learn more.'
-    bot.send_message(message.chat.id, message_text, reply_markup=start_user_markup())
+    await bot.send_message(message.chat.id, message_text, reply_markup=start_user_markup())
 
 
 # Handle '/help'
 @bot.message_handler(commands=['help'])
-def view_helper(message: object) -> None:
+async def view_helper(message: object) -> None:
     '''
     Hendler for /help command.
     :param object message: message object.
@@ -60,7 +65,28 @@ def view_helper(message: object) -> None:
     help_text = '🔵 You can interact with app by sending these commands:\n'
     for key in commands:
         help_text += key + ' - ' + commands[key] + '\n'
-    bot.send_message(message.chat.id, help_text)
+    await bot.send_message(message.chat.id, help_text)
+
+
+def session_step(handler):
+    '''
+    Decorator of next step handlers. It passes conversation session of the chat to the handler,
+    if the session expired, commands are handled as usual and other messages end the conversation.
+    :param handler: coroutine function which takes message and session.
+    :rtype: coroutine function which takes message.
+    '''
+    @wraps(handler)
+    async def wrapper(message: object) -> None:
+        lhelper = sessions.get(message.chat.id)
+        if lhelper is None:
+            if message.content_type == 'text' and message.text.startswith('/'):
+                await bot.process_message_handlers(message)
+                return
+            await bot.send_message(message.chat.id, '🔴 Session expired, please start again',
+                                   reply_markup=start_user_markup())
+            return
+        await handler(message, lhelper)
+    return wrapper
 
 
 # Markups for /set_limit flow
@@ -74,12 +100,13 @@ def single_cancel_button_markup() -> object:
     return markup
 
 
-def set_category_markup() -> object:
+async def set_category_markup(lhelper: LimiterHelper) -> object:
     '''
     Function returns markup with all existing categories and '🆕 Add category' and '❌ Cancel' buttons.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: ReplyKeyboardMarkup.
     '''
-    existing_categories = lhelper.get_categories()
+    existing_categories = await lhelper.get_categories()
     markup = ReplyKeyboardMarkup(one_time_keyboard=True, resize_keyboard=True)
     for entry in existing_categories:
         markup.row(entry)
@@ -139,19 +166,21 @@ def get_limit_markup(limit: list) -> object:
 
 
 # Helpers funcs for /set_limit flow
-def cancel(message: object) -> None:
+async def cancel(message: object) -> None:
     '''
     Message response function on 'cancel_message'.
     :param object message: message object.
     :rtype: None.
     '''
-    bot.send_message(message.chat.id, '🔵 Canceled', reply_markup=start_user_markup())
+    sessions.remove(message.chat.id)
+    await bot.send_message(message.chat.id, '🔵 Canceled', reply_markup=start_user_markup())
 
 
-def set_limit_summary(message: object) -> None:
+async def set_limit_summary(message: object, lhelper: LimiterHelper) -> None:
     '''
     Function sends message of summary of creating limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if lhelper.is_repeated:
@@ -168,231 +197,252 @@ def set_limit_summary(message: object) -> None:
                                                             period=lhelper.period,
                                                             start_date=lhelper.start_date.date(),
                                                             budget=budget)
-    bot.send_message(message.chat.id, text_off_message, reply_markup=accept_markup())
+    await bot.send_message(message.chat.id, text_off_message, reply_markup=accept_markup())
 
 
-def is_repeated_question(message: object) -> None:
+async def is_repeated_question(message: object, lhelper: LimiterHelper) -> None:
     '''
     Function sends question message of repeating limit (budget mode).
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
-    bot.send_message(message.chat.id,
-                     '🔵 You have set period (days): ' + str(lhelper.period) + '\n' +
-                     '⚪️ Do you want to enable budget mode (repeating period)?',
-                     reply_markup=yes_no_cancel_markup())
+    await bot.send_message(message.chat.id,
+                           '🔵 You have set period (days): ' + str(lhelper.period) + '\n' +
+                           '⚪️ Do you want to enable budget mode (repeating period)?',
+                           reply_markup=yes_no_cancel_markup())
 
 
 # Handlers for /set_limit flow
 @bot.message_handler(commands=['set_limit'])
-def set_limit(message: object) -> None:
+async def set_limit(message: object) -> None:
     '''
     Handler for "/set_limit" command.
     :param object message: message object.
     :rtype: None.
     '''
+    lhelper = sessions.start(message.chat.id)
     lhelper.handler = 'set_limit'
-    bot.send_message(message.chat.id, '⚪️ Choose category', reply_markup=set_category_markup())
+    await bot.send_message(message.chat.id, '⚪️ Choose category', reply_markup=await set_category_markup(lhelper))
     bot.register_next_step_handler(message, set_category_handler)
 
 
-def set_category_handler(message: object) -> None:
+@session_step
+async def set_category_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for choosing `category_name`.
     This handler responds to clicks from `set_category_markup()` and determines the further
     flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
-    existing_categories = lhelper.get_categories()
+    existing_categories = await lhelper.get_categories()
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.ADD_CATEGORY:
-        bot.send_message(message.chat.id, '⚪️ Enter name of category', reply_markup=single_cancel_button_markup())
+        await bot.send_message(message.chat.id, '⚪️ Enter name of category', reply_markup=single_cancel_button_markup())
         bot.register_next_step_handler(message, category_entered_value_handler)
     elif message.text in existing_categories:
         lhelper.category_name = message.text
-        bot.send_message(message.chat.id,
-                         '🔵 You selected category: ' + message.text + '\n' +
-                         '⚪️ Enter limit value (UAH)',
-                         reply_markup=single_cancel_button_markup())
+        await bot.send_message(message.chat.id,
+                               '🔵 You selected category: ' + message.text + '\n' +
+                               '⚪️ Enter limit value (UAH)',
+                               reply_markup=single_cancel_button_markup())
         bot.register_next_step_handler(message, set_limit_value_handler)
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, set_category_handler)
 
 
-def category_entered_value_handler(message: object) -> None:
+@session_step
+async def category_entered_value_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for manual input of `category_name`.
     This handler responds to clicks from `single_cancel_button_markup()` and manual inputting of any text.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     else:
         lhelper.category_name = message.text
-        bot.send_message(message.chat.id,
-                         '⚪️ You are creating a limit for category: ' + message.text,
-                         reply_markup=accept_markup(accept_change_button=True))
+        await bot.send_message(message.chat.id,
+                               '⚪️ You are creating a limit for category: ' + message.text,
+                               reply_markup=accept_markup(accept_change_button=True))
         bot.register_next_step_handler(message, category_accept_handler)
 
 
-def category_accept_handler(message: object) -> None:
+@session_step
+async def category_accept_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for manual input of `category_name`.
     This handler responds to clicks from `single_cancel_button_markup()` and manual inputting of any text.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.CHANGE:
-        bot.send_message(message.chat.id, '⚪️ Enter name of category', reply_markup=single_cancel_button_markup())
+        await bot.send_message(message.chat.id, '⚪️ Enter name of category', reply_markup=single_cancel_button_markup())
         bot.register_next_step_handler(message, category_entered_value_handler)
     elif message.text == button_titles.ACCEPT:
-        bot.send_message(message.chat.id,
-                         '🔵 You selected category: ' + lhelper.category_name + '\n' +
-                         '⚪️ Enter limit value (UAH)',
-                         reply_markup=single_cancel_button_markup())
+        await bot.send_message(message.chat.id,
+                               '🔵 You selected category: ' + lhelper.category_name + '\n' +
+                               '⚪️ Enter limit value (UAH)',
+                               reply_markup=single_cancel_button_markup())
         bot.register_next_step_handler(message, set_limit_value_handler)
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, category_accept_handler)
 
 
-def set_limit_value_handler(message: object) -> None:
+@session_step
+async def set_limit_value_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for manual input of `limit`.
     This handler responds and validates to manual inputting of limit.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     else:
         if lhelper.validate_limit(message.text):
             lhelper.start_date = datetime.utcnow()
             lhelper.limit = float(message.text)
-            bot.send_message(message.chat.id,
-                             '🔵 You have entered a limit: ' + message.text + '\n' +
-                             '⚪️ Select a period',
-                             reply_markup=set_period_markup())
+            await bot.send_message(message.chat.id,
+                                   '🔵 You have entered a limit: ' + message.text + '\n' +
+                                   '⚪️ Select a period',
+                                   reply_markup=set_period_markup())
             bot.register_next_step_handler(message, set_period_handler)
         else:
-            bot.send_message(message.chat.id,
-                             '🔴 The limit value must be a numeric value greater than zero',
-                             reply_markup=single_cancel_button_markup())
+            await bot.send_message(message.chat.id,
+                                   '🔴 The limit value must be a numeric value greater than zero',
+                                   reply_markup=single_cancel_button_markup())
             bot.register_next_step_handler(message, set_limit_value_handler)
 
 
-def set_period_handler(message: object) -> None:
+@session_step
+async def set_period_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler chosing `period`.
     This handler responds to clicks from `set_period_markup()` and manual inputting of any text.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     else:
         if message.text == button_titles.DAY:
             lhelper.period = 1
             if lhelper.handler == 'set_limit':
-                is_repeated_question(message)
+                await is_repeated_question(message, lhelper)
                 bot.register_next_step_handler(message, is_repeated_handler)
             else:
-                set_get_data_summary(message)
+                await set_get_data_summary(message, lhelper)
                 bot.register_next_step_handler(message, set_get_data_summary_handler)
         elif message.text == button_titles.WEEK:
             lhelper.period = 7
             if lhelper.handler == 'set_limit':
-                is_repeated_question(message)
+                await is_repeated_question(message, lhelper)
                 bot.register_next_step_handler(message, is_repeated_handler)
             else:
-                set_get_data_summary(message)
+                await set_get_data_summary(message, lhelper)
                 bot.register_next_step_handler(message, set_get_data_summary_handler)
         elif message.text == button_titles.MONTH:
             lhelper.period = 30
             if lhelper.handler == 'set_limit':
-                is_repeated_question(message)
+                await is_repeated_question(message, lhelper)
                 bot.register_next_step_handler(message, is_repeated_handler)
             else:
-                set_get_data_summary(message)
+                await set_get_data_summary(message, lhelper)
                 bot.register_next_step_handler(message, set_get_data_summary_handler)
         elif message.text == button_titles.YEAR:
             lhelper.period = 365
             if lhelper.handler == 'set_limit':
-                is_repeated_question(message)
+                await is_repeated_question(message, lhelper)
                 bot.register_next_step_handler(message, is_repeated_handler)
             else:
-                set_get_data_summary(message)
+                await set_get_data_summary(message, lhelper)
                 bot.register_next_step_handler(message, set_get_data_summary_handler)
         elif message.text == button_titles.ANOTHER_VALUE:
-            bot.send_message(message.chat.id,
-                             '⚪️ Enter the number of days ',
-                             reply_markup=single_cancel_button_markup())
+            await bot.send_message(message.chat.id,
+                                   '⚪️ Enter the number of days ',
+                                   reply_markup=single_cancel_button_markup())
             bot.register_next_step_handler(message, another_value_selected_handler)
         elif message.text == button_titles.SELECT_DATE:
             calendar_markup = tcalendar.calendar_today(message)
-            bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
+            await bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
             if lhelper.handler == 'set_limit':
                 bot.register_next_step_handler(message, calendar_handler)
             else:
                 bot.register_next_step_handler(message, calendar_handler_for_get_data)
         else:
-            bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+            await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
             bot.register_next_step_handler(message, set_period_handler)
 
 
-def another_value_selected_handler(message: object) -> None:
+@session_step
+async def another_value_selected_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for manual input of `period`.
     This handler responds to clicks from `single_cancel_button_markup()` and validates manual inputting of period.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     else:
         if lhelper.validate_period(message.text):
             lhelper.period = int(message.text)
             if lhelper.handler == 'set_limit':
-                is_repeated_question(message)
+                await is_repeated_question(message, lhelper)
                 bot.register_next_step_handler(message, is_repeated_handler)
             else:
-                set_get_data_summary(message)
+                await set_get_data_summary(message, lhelper)
                 bot.register_next_step_handler(message, set_get_data_summary_handler)
         else:
-            bot.send_message(message.chat.id,
-                             '🔴 Period must be an integer value greater than zero',
-                             reply_markup=single_cancel_button_markup())
+            await bot.send_message(message.chat.id,
+                                   '🔴 Period must be an integer value greater than zero',
+                                   reply_markup=single_cancel_button_markup())
             bot.register_next_step_handler(message, another_value_selected_handler)
 
 
-def calendar_handler(message: object) -> None:
+@session_step
+async def calendar_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for calendar.
     This handler responds and validates to clicks from `calendar_markup`.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.PREVIOUS:
         calendar_markup = tcalendar.calendar_previous_month(message)
-        bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
         bot.register_next_step_handler(message, calendar_handler)
     elif message.text == button_titles.NEXT:
         calendar_markup = tcalendar.calendar_next_month(message)
-        bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
+        bot.register_next_step_handler(message, calendar_handler)
+    elif message.chat.id not in tcalendar.current_shown_dates:
+        # shown month of the chat was evicted, so the tapped day can't be resolved
+        calendar_markup = tcalendar.calendar_today(message)
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
         bot.register_next_step_handler(message, calendar_handler)
     elif tcalendar.date_validation(message.text):
         saved_date = tcalendar.current_shown_dates.get(message.chat.id)
@@ -400,167 +450,188 @@ def calendar_handler(message: object) -> None:
         date = datetime(int(saved_date[0]), int(saved_date[1]), int(day), 0, 0, 0)
         if (date - lhelper.start_date).days >= 0:
             lhelper.period = int((date - lhelper.start_date).days) + 1
-            is_repeated_question(message)
+            await is_repeated_question(message, lhelper)
             bot.register_next_step_handler(message, is_repeated_handler)
         else:
-            bot.send_message(message.chat.id, '🔴 Date must be greater than current')
+            await bot.send_message(message.chat.id, '🔴 Date must be greater than current')
             bot.register_next_step_handler(message, calendar_handler)
     else:
         bot.register_next_step_handler(message, calendar_handler)
 
 
-def is_repeated_handler(message: object) -> None:
+@session_step
+async def is_repeated_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for choosing `is_repeated` value.
     This handler responds to clicks from `is_repeated_markup()`.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.YES:
         lhelper.is_repeated = True
-        set_limit_summary(message)
+        await set_limit_summary(message, lhelper)
         bot.register_next_step_handler(message, set_limit_summary_handler)
     elif message.text == button_titles.NO:
         lhelper.is_repeated = False
-        set_limit_summary(message)
+        await set_limit_summary(message, lhelper)
         bot.register_next_step_handler(message, set_limit_summary_handler)
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, is_repeated_handler)
 
 
-def set_limit_summary_handler(message):
+@session_step
+async def set_limit_summary_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for `set_limit_summary`.
     This handler responds to clicks from markup and any text input.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.ACCEPT:
-        bot.send_message(message.chat.id, '🔵 Limit created', reply_markup=ReplyKeyboardRemove())
-        lhelper.insert_limit()
+        await bot.send_message(message.chat.id, '🔵 Limit created', reply_markup=ReplyKeyboardRemove())
+        await lhelper.insert_limit()
+        sessions.remove(message.chat.id)
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, set_limit_summary_handler)
 
 
 # Handlers for /clear_limit flow
 @bot.message_handler(commands=['clear_limit'])
-def clear_limit(message: object) -> None:
+async def clear_limit(message: object) -> None:
     '''
     Handler for "/clear_limit" command.
     :param object message: message object.
     :rtype: None.
     '''
+    lhelper = sessions.start(message.chat.id)
     lhelper.handler = 'clear_limit'
-    limit = lhelper.get_limit_record()
+    limit = await lhelper.get_limit_record()
     if not limit:
-        bot.send_message(message.chat.id, '🔴 There is no limits yet. Use /set_limit to create limit.')
+        await bot.send_message(message.chat.id, '🔴 There is no limits yet. Use /set_limit to create limit.')
     else:
-        bot.send_message(message.chat.id, '⚪️ Please, choose a category', reply_markup=get_limit_markup(limit))
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a category', reply_markup=get_limit_markup(limit))
         bot.register_next_step_handler(message, clear_category_handler)
 
 
-def clear_category_handler(message: object) -> None:
+@session_step
+async def clear_category_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for choosing `category_name`.
     This handler responds to clicks from `set_category_markup()` and determines the further
     flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
-    existing_categories = lhelper.get_categories()
+    existing_categories = await lhelper.get_categories()
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text in existing_categories:
         lhelper.category_name = message.text
-        bot.send_message(message.chat.id,
-                         '🔵 You selected category: ' + message.text +
-                         '⚪️ Do you want to delete the limit?',
-                         reply_markup=accept_markup())
+        await bot.send_message(message.chat.id,
+                               '🔵 You selected category: ' + message.text +
+                               '⚪️ Do you want to delete the limit?',
+                               reply_markup=accept_markup())
         bot.register_next_step_handler(message, clear_limit_summary_handler)
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, clear_category_handler)
 
 
-def clear_limit_summary_handler(message):
+@session_step
+async def clear_limit_summary_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for `set_limit_summary`.
     This handler responds to clicks from markup and any text input.
     Determines the further flow of the setting of limit.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.ACCEPT:
-        bot.send_message(message.chat.id, '🔵 Limit removed', reply_markup=ReplyKeyboardRemove())
-        lhelper.clear_limit()
+        await bot.send_message(message.chat.id, '🔵 Limit removed', reply_markup=ReplyKeyboardRemove())
+        await lhelper.clear_limit()
+        sessions.remove(message.chat.id)
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, clear_limit_summary_handler)
 
 
 # Handlers for /get_data_period flow
 @bot.message_handler(commands=['get_data_period'])
-def get_data_period(message: object) -> None:
+async def get_data_period(message: object) -> None:
     '''
     Handler for "/get_data_period" command.
     :param object message: message object.
     :rtype: None.
     '''
+    lhelper = sessions.start(message.chat.id)
     lhelper.handler = 'get_data_period'
-    bot.send_message(message.chat.id, '⚪️ Choose category', reply_markup=set_category_markup())
+    await bot.send_message(message.chat.id, '⚪️ Choose category', reply_markup=await set_category_markup(lhelper))
     bot.register_next_step_handler(message, set_handler_for_existing_categories)
 
 
-def set_handler_for_existing_categories(message: object) -> None:
+@session_step
+async def set_handler_for_existing_categories(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for choosing `category_name`.
     This handler responds to clicks from `set_markup_for_existing_categories()` and determines the further
     flow of the getting data period.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
-    existing_categories = lhelper.get_categories()
+    existing_categories = await lhelper.get_categories()
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text in existing_categories:
         lhelper.category_name = message.text
-        bot.send_message(message.chat.id,
-                         '🔵 You selected category: ' + message.text + '\n' +
-                         '⚪️ Please, choose period or start date for category',
-                         reply_markup=set_period_markup())
+        await bot.send_message(message.chat.id,
+                               '🔵 You selected category: ' + message.text + '\n' +
+                               '⚪️ Please, choose period or start date for category',
+                               reply_markup=set_period_markup())
         bot.register_next_step_handler(message, set_period_handler)
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, set_handler_for_existing_categories)
 
 
-def calendar_handler_for_get_data(message: object) -> None:
+@session_step
+async def calendar_handler_for_get_data(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for calendar.
     This handler responds and validates to clicks from `calendar_markup`.
     Determines the further flow of the getting data for category.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.PREVIOUS:
         calendar_markup = tcalendar.calendar_previous_month(message)
-        bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
         bot.register_next_step_handler(message, calendar_handler_for_get_data)
     elif message.text == button_titles.NEXT:
         calendar_markup = tcalendar.calendar_next_month(message)
-        bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
+        bot.register_next_step_handler(message, calendar_handler_for_get_data)
+    elif message.chat.id not in tcalendar.current_shown_dates:
+        # shown month of the chat was evicted, so the tapped day can't be resolved
+        calendar_markup = tcalendar.calendar_today(message)
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a date', reply_markup=calendar_markup)
         bot.register_next_step_handler(message, calendar_handler_for_get_data)
     elif tcalendar.date_validation(message.text):
         saved_date = tcalendar.current_shown_dates.get(message.chat.id)
@@ -568,58 +639,64 @@ def calendar_handler_for_get_data(message: object) -> None:
         date = datetime(int(saved_date[0]), int(saved_date[1]), int(day), 0, 0, 0)
         if (lhelper.end_period - date).days >= 0:
             lhelper.start_period = date
-            set_get_data_summary(message)
+            await set_get_data_summary(message, lhelper)
             bot.register_next_step_handler(message, set_get_data_summary_handler)
         else:
-            bot.send_message(message.chat.id, '🔴 Date must be less than current')
+            await bot.send_message(message.chat.id, '🔴 Date must be less than current')
             bot.register_next_step_handler(message, calendar_handler_for_get_data)
     else:
         bot.register_next_step_handler(message, calendar_handler_for_get_data)
 
 
-def set_get_data_summary(message: object) -> None:
+async def set_get_data_summary(message: object, lhelper: LimiterHelper) -> None:
     '''
     Function sends message of summary of get data.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     text_off_message = '🔵 You are getting data for the  {} category'.format(lhelper.category_name)
-    bot.send_message(message.chat.id, text_off_message, reply_markup=accept_markup())
+    await bot.send_message(message.chat.id, text_off_message, reply_markup=accept_markup())
 
 
-def set_get_data_summary_handler(message):
+@session_step
+async def set_get_data_summary_handler(message: object, lhelper: LimiterHelper) -> None:
     '''
     Handler for `set_get_data_summary_handler.
     This handler responds to clicks from markup and any text input.
     Determines the further flow of the getting data for category.
     :param object message: message object.
+    :param LimiterHelper lhelper: conversation session of the chat.
     :rtype: None.
     '''
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     elif message.text == button_titles.ACCEPT:
-        result = lhelper.get_period_for_category()
+        result = await lhelper.get_period_for_category()
+        sessions.remove(message.chat.id)
         msg = result if result else 'For this category in selected date range no transactions found'
-        bot.send_message(message.chat.id, msg, reply_markup=ReplyKeyboardRemove())
+        await bot.send_message(message.chat.id, msg, reply_markup=ReplyKeyboardRemove())
     else:
-        bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
+        await bot.send_message(message.chat.id, '🔴 Please select one of the menu items')
         bot.register_next_step_handler(message, set_get_data_summary_handler)
 
 
 @bot.message_handler(commands=['get_limit'])
-def get_limit(message: object) -> None:
-    limit = lhelper.get_limit_record()
+async def get_limit(message: object) -> None:
+    lhelper = sessions.start(message.chat.id)
+    limit = await lhelper.get_limit_record()
     if not limit:
-        bot.send_message(message.chat.id, '🔴 There is no limits yet. Use /set_limit to create limit.')
+        await bot.send_message(message.chat.id, '🔴 There is no limits yet. Use /set_limit to create limit.')
     else:
-        bot.send_message(message.chat.id, '⚪️ Please, choose a category', reply_markup=get_limit_markup(limit))
+        await bot.send_message(message.chat.id, '⚪️ Please, choose a category', reply_markup=get_limit_markup(limit))
         bot.register_next_step_handler(message, get_limit_handler)
 
 
-def get_limit_handler(message: object) -> None:
-    limit = lhelper.get_limit_record()
+@session_step
+async def get_limit_handler(message: object, lhelper: LimiterHelper) -> None:
+    limit = await lhelper.get_limit_record()
     if message.text == button_titles.CANCEL:
-        cancel(message)
+        await cancel(message)
     else:
         index = 0
         for item in limit:
@@ -632,5 +709,5 @@ def get_limit_handler(message: object) -> None:
             'Budget mode: "{is_repeated}"\n' +
             'Start from: "{start_date}"'
         ).format(**limit[index])
-
-        bot.send_message(message.chat.id, msg, reply_markup=ReplyKeyboardRemove())
+        sessions.remove(message.chat.id)
+        await bot.send_message(message.chat.id, msg, reply_markup=ReplyKeyboardRemove())
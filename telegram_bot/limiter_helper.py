@@ -1,21 +1,47 @@
-import asyncio
 from datetime import datetime
 
+from config import telegram
+from database.data_version import data_version
+from database.query_cache import QueryCache
 from database.helpers import \
     get_limit, \
     upsert_limit, \
     delete_limit, \
     get_data_period
 
+LIMITS_KEY = 'limits'
+
+# limits are the same for all chats, so one cache is shared by sessions of the bot
+limits_cache = QueryCache(maxsize=1, ttl=telegram['limits_cache_ttl'])
+
+
+async def get_limits() -> list:
+    '''
+    Asynchronous function for getting all rows of category table from `limits_cache`.
+    Cached rows are read again after TTL, after data version is bumped and after limits are changed by the bot.
+
+    :return list: list of dictionaries like `database.helpers.get_limit` returns, they must not be changed.
+    '''
+    version = data_version.value
+    limits = limits_cache.get(LIMITS_KEY, version)
+    if limits is None:
+        limits = await get_limit()
+        limits_cache.set(LIMITS_KEY, version, limits)
+    return limits
+
 
 class LimiterHelper(object):
     '''
     This is LimiterHelper class. Use it for accumulating data for
     "/set_limit", "/get_limit", "/delete_limit" commands in telegram bot.
+    One object is conversation session of one chat.
     Methods:
         validate_limit
         validate_period
     '''
+    __slots__ = ('__category_name', '__limit', '__period', '__start_date', '__is_repeated',
+                 '__start_period', '__end_period', 'handler')
+
     def __init__(self):
         self.__category_name = None
         self.__limit = None
@@ -133,34 +159,31 @@ class LimiterHelper(object):
         except ValueError:
             return False
 
-    def get_categories(self) -> list:
+    async def get_categories(self) -> list:
         result = []
-        loop = asyncio.get_event_loop()
-        limits = loop.run_until_complete(get_limit())
+        limits = await get_limits()
         for lim in limits:
             result.append(lim['title'])
         return result
 
-    def insert_limit(self) -> None:
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(upsert_limit(self.__category_name,
-                                             limit=self.__limit,
-                                             period=self.__period,
-                                             start_date=self.__start_date,
-                                             is_repeated=self.__is_repeated))
+    async def insert_limit(self) -> None:
+        await upsert_limit(self.__category_name,
+                           limit=self.__limit,
+                           period=self.__period,
+                           start_date=self.__start_date,
+                           is_repeated=self.__is_repeated)
+        limits_cache.clear()
 
-    def get_period_for_category(self) -> list:
+    async def get_period_for_category(self) -> list:
         result = []
         start_date = None
-        loop = asyncio.get_event_loop()
         end_date = str(self.__end_period.strftime('%d-%m-%Y'))
         if self.__start_period:
             start_date = str(self.__start_period.strftime('%d-%m-%Y'))
-        transactions = loop.run_until_complete(get_data_period(self.__category_name,
-                                                               period=self.__period,
-                                                               start_date=start_date,
-                                                               end_date=end_date
-                                                               ))
+        transactions = await get_data_period(self.__category_name,
+                                             period=self.__period,
+                                             start_date=start_date,
+                                             end_date=end_date)
         for transaction in transactions:
             if transaction:
                 msg = 'date: {0}, account: {1}, amount: {2}, currency: {3}'.format(
@@ -172,14 +195,13 @@ class LimiterHelper(object):
                 result.append(msg)
         return result
 
-    def clear_limit(self) -> None:
-        loop = asyncio.get_event_loop()
-        loop.run_until_complete(delete_limit(self.__category_name))
+    async def clear_limit(self) -> None:
+        await delete_limit(self.__category_name)
+        limits_cache.clear()
 
-    def get_limit_record(self) -> list:
+    async def get_limit_record(self) -> list:
         result = []
-        loop = asyncio.get_event_loop()
-        limits = loop.run_until_complete(get_limit())
+        limits = await get_limits()
         for lim in limits:
             if lim['limit']:
                 result.append(lim)
@@ -0,0 +1,86 @@
+import time
+from collections import OrderedDict
+
+
+class SessionStore(object):
+    '''
+    This is SessionStore class. It keeps conversation sessions of the bot by chat id.
+    Sessions which are not used for `ttl` seconds are evicted, when the store is full
+    the least recently used session is evicted. Removal of the session by `remove` is not eviction.
+    Methods:
+        start
+        get
+        remove
+    '''
+    def __init__(self, factory, maxsize=1000, ttl=900.0, on_evict=None):
+        '''
+        :param factory: callable without arguments which returns new session.
+        :param int maxsize: max number of live sessions.
+        :param float ttl: number of seconds idle session is kept.
+        :param on_evict: callable which takes chat id, it is called when session of the chat is evicted.
+        '''
+        self._factory = factory
+        self._on_evict = on_evict
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._sessions = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def start(self, chat_id: int):
+        '''
+        This method starts new session of the chat, previous session of the chat is dropped.
+
+        :param int chat_id: id of the chat.
+        :return: new session.
+        '''
+        now = time.monotonic()
+        self._evict_expired(now)
+        session = self._factory()
+        self._sessions.pop(chat_id, None)
+        self._sessions[chat_id] = (now + self._ttl, session)
+        while len(self._sessions) > self._maxsize:
+            self._evict(next(iter(self._sessions)))
+        return session
+
+    def get(self, chat_id: int):
+        '''
+        This method returns session of the chat and prolongs it.
+
+        :param int chat_id: id of the chat.
+        :return: session or None if the chat has no session or it expired.
+        '''
+        entry = self._sessions.get(chat_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        expires, session = entry
+        if expires <= now:
+            self._evict(chat_id)
+            return None
+        self._sessions[chat_id] = (now + self._ttl, session)
+        self._sessions.move_to_end(chat_id)
+        return session
+
+    def remove(self, chat_id: int) -> None:
+        '''
+        This method drops session of the chat.
+
+        :param int chat_id: id of the chat.
+        :rtype: None
+        '''
+        self._sessions.pop(chat_id, None)
+
+    def _evict_expired(self, now: float) -> None:
+        # sessions are ordered by the last use, so expired ones are at the beginning
+        while self._sessions:
+            chat_id, (expires, _) = next(iter(self._sessions.items()))
+            if expires > now:
+                break
+            self._evict(chat_id)
+
+    def _evict(self, chat_id: int) -> None:
+        del self._sessions[chat_id]
+        if self._on_evict is not None:
+            self._on_evict(chat_id)
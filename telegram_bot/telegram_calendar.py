@@ -1,26 +1,63 @@
 import calendar
 from datetime import datetime
+from functools import lru_cache
+from collections import OrderedDict
 from telebot import types
 
 from telegram_bot import button_titles
 
 
-class TelegramCalendar(object):
+class ShownDates(OrderedDict):
+    '''
+    This is ShownDates class. It keeps (year, month) shown to the chat by chat id,
+    the chat which calendar was shown the longest time ago is evicted when the store is full.
+    '''
+    def __init__(self, maxsize=1000):
+        '''
+        :param int maxsize: max number of chats.
+        '''
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __setitem__(self, chat_id, date):
+        super().__setitem__(chat_id, date)
+        self.move_to_end(chat_id)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
 
-    def __init__(self):
-        self.__current_shown_dates = {}
+
+class TelegramCalendar(object):
+    '''
+    This is TelegramCalendar class. It creates month keyboards of the bot, keyboards are rendered
+    to JSON once per (year, month) and kept in LRU cache.
+    '''
+    def __init__(self, cache_size=24, shown_dates_size=1000):
+        '''
+        :param int cache_size: max number of cached month keyboards.
+        :param int shown_dates_size: max number of chats which shown months are kept.
+        '''
+        self.__current_shown_dates = ShownDates(shown_dates_size)
+        self.__create_calendar = lru_cache(maxsize=cache_size)(self.__render_calendar)
 
     @property
     def current_shown_dates(self):
         return self.__current_shown_dates
 
-    def __create_calendar(self, year, month) -> object:
+    def cache_info(self):
+        '''
+        Function returns hits, misses, maxsize and currsize of the keyboard cache.
+
+        :rtype: functools._CacheInfo.
+        '''
+        return self.__create_calendar.cache_info()
+
+    def __render_calendar(self, year, month) -> str:
         '''
         Function creates keyboard markup for telegram bot.
 
         :param int year: year for markup creation.
         :param int month: month for markup creation.
-        :return object: returns ReplyMarkupKeyboard object.
+        :return str: returns JSON of ReplyMarkupKeyboard object, it is sent as is.
         '''
         markup = types.ReplyKeyboardMarkup()
         # First row - Month and Year
@@ -43,7 +80,7 @@ class TelegramCalendar(object):
             markup.row(*row)
         # Last row - Buttons
         markup.row(button_titles.CANCEL)
-        return markup
+        return markup.to_json()
 
     def date_validation(self, value: type) -> bool:
         '''
@@ -65,7 +102,7 @@ class TelegramCalendar(object):
         Function creates calendar markup which based on the current month.
 
         :param object message: message object.
-        :rtype: ReplyKeyboardMarkup.
+        :rtype: str.
         '''
         now = datetime.now()
         chat_id = message.chat.id
@@ -79,7 +116,7 @@ class TelegramCalendar(object):
         Function creates calendar markup for next month which based on the `self.__current_shown_dates` variable.
 
         :param object message: message object.
-        :rtype: ReplyKeyboardMarkup.
+        :rtype: str.
         '''
         chat_id = message.chat.id
         saved_date = self.__current_shown_dates.get(chat_id)
@@ -94,15 +131,15 @@ class TelegramCalendar(object):
             markup = self.__create_calendar(year, month)
             return markup
         else:
-            # Do something to inform of the error
-            pass
+            # shown month of the chat was evicted
+            return self.calendar_today(message)
 
     def calendar_previous_month(self, message: object) -> object:
         '''
         Function creates calendar markup for previous month which based on the `self.__current_shown_dates` variable.
 
         :param object message: message object.
-        :rtype: ReplyKeyboardMarkup.
+        :rtype: str.
         '''
         chat_id = message.chat.id
         saved_date = self.__current_shown_dates.get(chat_id)
@@ -117,5 +154,5 @@ class TelegramCalendar(object):
             markup = self.__create_calendar(year, month)
             return markup
         else:
-            # Do something to inform of the error
-            pass
+            # shown month of the chat was evicted
+            return self.calendar_today(message)
@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import telebot
+from telebot import types
+
+from telegram_bot.async_bot import AsyncBot
+
+
+def make_update(update_id, chat_id, text):
+    return types.Update.de_json({
+        'update_id': update_id,
+        'message': {'message_id': update_id, 'date': 0, 'chat': {'id': chat_id, 'type': 'private'}, 'text': text}
+    })
+
+
+class AsyncBotTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.bot = AsyncBot('123:token')
+        self.handled = []
+
+    def process(self, *updates):
+        for update in updates:
+            self.bot.process_update(update)
+        self.loop.run_until_complete(self.bot.join())
+
+    def test_messages_of_chat_are_handled_in_order(self):
+        @self.bot.message_handler(func=lambda message: True)
+        async def slow(message):
+            # the first message waits longer, it must be handled before the second one anyway
+            await asyncio.sleep(0.05 if message.text == 'first' else 0)
+            self.handled.append(message.text)
+
+        self.process(make_update(1, 5, 'first'), make_update(2, 5, 'second'))
+        self.assertEqual(self.handled, ['first', 'second'])
+        self.assertEqual(self.bot.last_update_id, 2)
+
+    def test_chats_are_handled_concurrently(self):
+        @self.bot.message_handler(func=lambda message: True)
+        async def slow(message):
+            await asyncio.sleep(0.05 if message.chat.id == 5 else 0)
+            self.handled.append(message.chat.id)
+
+        self.process(make_update(1, 5, 'a'), make_update(2, 6, 'b'))
+        self.assertEqual(self.handled, [6, 5])
+
+    def test_first_matching_handler_is_called(self):
+        @self.bot.message_handler(commands=['start'])
+        async def start(message):
+            self.handled.append('start')
+
+        @self.bot.message_handler(func=lambda message: True)
+        async def other(message):
+            self.handled.append('other')
+
+        self.process(make_update(1, 5, '/start'), make_update(2, 5, 'text'))
+        self.assertEqual(self.handled, ['start', 'other'])
+
+    def test_next_step_handler(self):
+        async def next_step(message):
+            self.handled.append('next ' + message.text)
+
+        @self.bot.message_handler(commands=['start'])
+        async def start(message):
+            self.handled.append('start')
+            self.bot.register_next_step_handler(message, next_step)
+
+        self.process(make_update(1, 5, '/start'), make_update(2, 5, 'answer'), make_update(3, 5, '/start'))
+        self.assertEqual(self.handled, ['start', 'next answer', 'start'])
+
+    def test_clear_step_handler_by_chat_id(self):
+        async def next_step(message):
+            self.handled.append('next')
+
+        @self.bot.message_handler(func=lambda message: True)
+        async def other(message):
+            self.handled.append('other')
+            self.bot.register_next_step_handler(message, next_step)
+
+        self.process(make_update(1, 5, 'text'))
+        self.bot.clear_step_handler_by_chat_id(5)
+        self.bot.clear_step_handler_by_chat_id(6)
+        self.assertEqual(self.bot.pre_message_subscribers_next_step, {})
+        self.process(make_update(2, 5, 'text'))
+        self.assertEqual(self.handled, ['other', 'other'])
+
+    def test_failed_handler_does_not_stop_chat(self):
+        @self.bot.message_handler(func=lambda message: True)
+        async def failing(message):
+            self.handled.append(message.text)
+            raise ValueError(message.text)
+
+        with self.assertLogs('telegram_bot.async_bot', 'ERROR'):
+            self.process(make_update(1, 5, 'first'), make_update(2, 5, 'second'))
+        self.assertEqual(self.handled, ['first', 'second'])
+
+    def test_send_message(self):
+        with mock.patch.object(telebot.TeleBot, 'send_message', return_value='sent') as send_message:
+            result = self.loop.run_until_complete(self.bot.send_message(5, 'text', reply_markup=None))
+        self.assertEqual(result, 'sent')
+        send_message.assert_called_once_with(5, 'text', reply_markup=None)
+
+    def test_polling_handles_updates_until_stopped(self):
+        @self.bot.message_handler(func=lambda message: True)
+        async def handler(message):
+            self.handled.append(message.text)
+            self.bot.stop_polling()
+
+        with mock.patch.object(self.bot, 'get_updates', return_value=[make_update(7, 5, 'text')]) as get_updates:
+            self.loop.run_until_complete(asyncio.wait_for(self.bot.polling(timeout=1), 5))
+            self.loop.run_until_complete(self.bot.join())
+        self.assertEqual(self.handled[0], 'text')
+        get_updates.assert_any_call(offset=1, timeout=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
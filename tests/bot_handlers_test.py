@@ -0,0 +1,109 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from telebot import types
+
+from telegram_bot import bot_handlers, button_titles
+from telegram_bot.limiter_helper import LimiterHelper
+from telegram_bot.session_store import SessionStore
+
+
+class BotHandlersTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.sent = []
+        self.inserted = []
+        self.update_id = 0
+        patchers = [
+            mock.patch.object(bot_handlers, 'sessions', SessionStore(
+                LimiterHelper, ttl=60, on_evict=bot_handlers.bot.clear_step_handler_by_chat_id)),
+            mock.patch.object(bot_handlers.bot, 'send_message', self.send_message),
+            mock.patch.object(LimiterHelper, 'get_categories', autospec=True, side_effect=self.get_categories),
+            mock.patch.object(LimiterHelper, 'insert_limit', autospec=True, side_effect=self.insert_limit)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(bot_handlers.bot.pre_message_subscribers_next_step.clear)
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.sent.append((chat_id, text))
+
+    async def get_categories(self, lhelper):
+        return ['Food', 'Taxi']
+
+    async def insert_limit(self, lhelper):
+        self.inserted.append((lhelper.category_name, lhelper.limit))
+
+    def send(self, chat_id, text):
+        self.update_id += 1
+        bot_handlers.bot.process_update(types.Update.de_json({
+            'update_id': self.update_id,
+            'message': {'message_id': self.update_id, 'date': 0,
+                        'chat': {'id': chat_id, 'type': 'private'}, 'text': text}
+        }))
+        self.loop.run_until_complete(bot_handlers.bot.join())
+
+    def test_chats_have_own_sessions(self):
+        self.send(5, '/set_limit')
+        self.send(6, '/set_limit')
+        self.send(5, 'Food')
+        self.send(6, 'Taxi')
+        self.send(5, '100')
+        self.send(6, '200')
+        for chat_id in (5, 6):
+            self.send(chat_id, button_titles.DAY)
+            self.send(chat_id, button_titles.NO)
+            self.send(chat_id, button_titles.ACCEPT)
+        self.assertEqual(sorted(self.inserted), [('Food', 100.0), ('Taxi', 200.0)])
+        self.assertEqual(len(bot_handlers.sessions), 0)
+
+    def test_cancel_ends_session(self):
+        self.send(5, '/set_limit')
+        self.send(5, button_titles.CANCEL)
+        self.assertEqual(len(bot_handlers.sessions), 0)
+        self.assertEqual(self.sent[-1], (5, '🔵 Canceled'))
+
+    def test_expired_session(self):
+        self.send(5, '/set_limit')
+        bot_handlers.sessions.remove(5)
+        self.send(5, 'Food')
+        self.assertEqual(self.sent[-1], (5, '🔴 Session expired, please start again'))
+        self.send(5, 'Food')
+        self.assertNotIn(5, bot_handlers.bot.pre_message_subscribers_next_step)
+
+    def test_command_after_expired_session(self):
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=100.0):
+            self.send(5, '/set_limit')
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=200.0):
+            self.send(5, '/help')
+        self.assertEqual(self.sent[-1][0], 5)
+        self.assertIn('/get_data_period', self.sent[-1][1])
+        self.assertNotIn(5, bot_handlers.bot.pre_message_subscribers_next_step)
+
+    def test_evicted_session_drops_next_step(self):
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=100.0):
+            self.send(5, '/set_limit')
+        self.assertIn(5, bot_handlers.bot.pre_message_subscribers_next_step)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=200.0):
+            self.send(6, '/set_limit')
+        self.assertNotIn(5, bot_handlers.bot.pre_message_subscribers_next_step)
+        self.assertIn(6, bot_handlers.bot.pre_message_subscribers_next_step)
+        self.send(5, '/help')
+        self.assertIn('/get_data_period', self.sent[-1][1])
+
+    def test_evicted_calendar_is_shown_again(self):
+        self.send(5, '/get_data_period')
+        self.send(5, 'Food')
+        self.send(5, button_titles.SELECT_DATE)
+        del bot_handlers.tcalendar.current_shown_dates[5]
+        self.send(5, '5')
+        self.assertEqual(self.sent[-1], (5, '⚪️ Please, choose a date'))
+        self.assertIn(5, bot_handlers.tcalendar.current_shown_dates)
+
+
+if __name__ == '__main__':
+    unittest.main()
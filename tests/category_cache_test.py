@@ -0,0 +1,105 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from database import helpers
+from database.category_cache import CategoryCache
+
+
+class FakeResult(object):
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetchall(self):
+        return self.rows
+
+
+class FakeConnection(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    async def execute(self, query):
+        self.queries += 1
+        return FakeResult(self.rows)
+
+    async def scalar(self, query):
+        self.queries += 1
+        title = query.compile().params['title_1']
+        return next((row['id'] for row in self.rows if row['title'] == title), None)
+
+
+class FakeEngine(object):
+    def __init__(self, connection):
+        self.connection = connection
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self.connection
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class CategoryCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.cache = CategoryCache()
+
+    def test_load(self):
+        connection = FakeConnection([{'id': 1, 'title': 'food'}, {'id': 2, 'title': 'taxi'}])
+        self.loop.run_until_complete(self.cache.load(connection))
+        self.assertTrue(self.cache.loaded)
+        self.assertEqual(self.cache.get('taxi'), 2)
+        self.assertIsNone(self.cache.get('car'))
+
+    def test_add_and_update(self):
+        self.cache.add('food', 1)
+        self.cache.update({'taxi': 2, 'car': 3})
+        self.assertEqual([self.cache.get(title) for title in ('food', 'taxi', 'car')], [1, 2, 3])
+
+    def test_invalidate(self):
+        self.loop.run_until_complete(self.cache.load(FakeConnection([{'id': 1, 'title': 'food'}])))
+        self.cache.invalidate()
+        self.assertFalse(self.cache.loaded)
+        self.assertIsNone(self.cache.get('food'))
+
+
+class GetCategoryIdTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.connection = FakeConnection([{'id': 1, 'title': 'food'}])
+        self.cache = CategoryCache()
+
+        async def get_engine():
+            return FakeEngine(self.connection)
+
+        for name, value in (('get_engine', get_engine), ('category_cache', self.cache)):
+            patcher = mock.patch.object(helpers, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_category_id(self, title):
+        return self.loop.run_until_complete(helpers.get_category_id(title))
+
+    def test_cache_is_loaded_once(self):
+        self.assertEqual(self.get_category_id('food'), 1)
+        self.assertEqual(self.get_category_id('food'), 1)
+        self.assertEqual(self.connection.queries, 1)
+
+    def test_missing_title_is_selected_alone(self):
+        self.get_category_id('food')
+        self.connection.rows.append({'id': 2, 'title': 'taxi'})
+        self.assertIsNone(self.get_category_id('car'))
+        self.assertEqual(self.get_category_id('taxi'), 2)
+        self.assertEqual(self.get_category_id('taxi'), 2)
+        # one load, then one select per missing title
+        self.assertEqual(self.connection.queries, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
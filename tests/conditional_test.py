@@ -0,0 +1,72 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from sanic.response import json
+
+from database.data_version import DataVersion
+from monefystat_api import service_resource
+
+
+class FakeRequest(object):
+    def __init__(self, if_none_match=None):
+        self.headers = {}
+        if if_none_match:
+            self.headers['If-None-Match'] = if_none_match
+
+
+class ConditionalTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.addCleanup(self.loop.close)
+        self.calls = 0
+        self.version = DataVersion()
+        self.version.listening = True
+        patcher = mock.patch.object(service_resource, 'data_version', self.version)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        @service_resource.conditional
+        async def handler(request):
+            self.calls += 1
+            return json({'calls': self.calls}, status=404 if request.headers.get('X-Missing') else 200)
+
+        self.handler = handler
+
+    def get(self, request):
+        return self.loop.run_until_complete(self.handler(request))
+
+    def test_not_modified(self):
+        etag = self.get(FakeRequest()).headers['ETag']
+        response = self.get(FakeRequest(etag))
+        self.assertEqual(response.status, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(self.calls, 1)
+
+    def test_weak_and_listed_tags(self):
+        etag = self.get(FakeRequest()).headers['ETag']
+        self.assertEqual(self.get(FakeRequest('"other", W/' + etag)).status, 304)
+        self.assertEqual(self.get(FakeRequest('*')).status, 304)
+        self.assertEqual(self.calls, 1)
+
+    def test_new_data_version(self):
+        etag = self.get(FakeRequest()).headers['ETag']
+        self.version.bump()
+        response = self.get(FakeRequest(etag))
+        self.assertEqual(response.status, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_not_listening(self):
+        self.version.listening = False
+        response = self.get(FakeRequest('*'))
+        self.assertEqual(response.status, 200)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_error_has_no_etag(self):
+        request = FakeRequest()
+        request.headers['X-Missing'] = '1'
+        self.assertNotIn('ETag', self.get(request).headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,35 @@
+import os
 import unittest
+import tempfile
+from collections import namedtuple
+from dropbox.files import FileMetadata, DeletedMetadata
 from transport.data_provider import DataProvider
 
 
+ListFolderResult = namedtuple('ListFolderResult', ['entries', 'cursor', 'has_more'])
+
+
+class FakeDropbox(object):
+    '''Dropbox client which returns prepared list_folder pages and records calls.'''
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def files_list_folder(self, path):
+        self.calls.append(('list', path))
+        return self.pages['']
+
+    def files_list_folder_continue(self, cursor):
+        self.calls.append(('continue', cursor))
+        return self.pages[cursor]
+
+    def files_download_to_file(self, download_path, path):
+        self.calls.append(('download', path))
+        with open(download_path, 'w') as downloaded:
+            downloaded.write(path)
+        return FileMetadata(name=path.lstrip('/'), content_hash='a' * 64)
+
+
 class DataProviderTest(unittest.TestCase):
     def setUp(self):
         self.classObj = DataProvider('TOKEN', '', '/', 'manual')
@@ -54,6 +82,87 @@ class DataProviderTest(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.classObj.mode = 'invalid'
 
+    def test_invalid_state_path_type(self):
+        with self.assertRaises(AssertionError):
+            self.classObj = DataProvider('TOKEN', '', '/', 'auto', 1)
+
+
+class DataProviderCursorTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.directory, 'state.json')
+        self.pages = {
+            '': ListFolderResult([FileMetadata(name='Monefy.Data.1', content_hash='a' * 64)], 'c1', True),
+            'c1': ListFolderResult([FileMetadata(name='Monefy.Data.2', content_hash='b' * 64)], 'c2', False),
+            'c2': ListFolderResult([DeletedMetadata(name='Monefy.Data.2'),
+                                    FileMetadata(name='Monefy.Data.3', content_hash='c' * 64)], 'c3', False)
+        }
+
+    def create_provider(self):
+        provider = DataProvider('TOKEN', '', '/', 'auto', self.state_path)
+        provider.dbx = FakeDropbox(self.pages)
+        return provider
+
+    def test_full_listing_follows_pages(self):
+        provider = self.create_provider()
+        self.assertEqual(provider.get_files_list(), ['Monefy.Data.1', 'Monefy.Data.2'])
+        self.assertEqual(provider.dbx.calls, [('list', ''), ('continue', 'c1')])
+
+    def test_cursor_is_stored_between_instances(self):
+        self.create_provider().get_files_list()
+        provider = self.create_provider()
+        self.assertEqual(provider.get_files_list(), ['Monefy.Data.1', 'Monefy.Data.3'])
+        self.assertEqual(provider.dbx.calls, [('continue', 'c2')])
+
+
+class DataProviderDownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.pages = {
+            '': ListFolderResult([FileMetadata(name='Monefy.Data.1', content_hash='a' * 64)], 'c1', False),
+            'c1': ListFolderResult([], 'c1', False)
+        }
+
+    def create_provider(self):
+        provider = DataProvider('TOKEN', os.path.join(self.directory, 'Monefy_data.csv'), '/', 'auto')
+        provider.dbx = FakeDropbox(self.pages)
+        return provider
+
+    def test_first_download(self):
+        provider = self.create_provider()
+        self.assertTrue(provider.get_newest_monefy_data())
+        self.assertIn(('download', '/Monefy.Data.1'), provider.dbx.calls)
+
+    def test_download_skipped_for_same_content_hash(self):
+        self.create_provider().get_newest_monefy_data()
+        provider = self.create_provider()
+        # the file is not imported yet
+        self.assertTrue(provider.get_newest_monefy_data())
+        self.assertNotIn(('download', '/Monefy.Data.1'), provider.dbx.calls)
+
+    def test_imported_file_is_not_modified(self):
+        provider = self.create_provider()
+        provider.get_newest_monefy_data()
+        provider.mark_imported()
+        provider = self.create_provider()
+        self.assertFalse(provider.get_newest_monefy_data())
+        self.assertNotIn(('download', '/Monefy.Data.1'), provider.dbx.calls)
+
+    def test_new_content_is_downloaded_after_import(self):
+        provider = self.create_provider()
+        provider.get_newest_monefy_data()
+        provider.mark_imported()
+        self.pages['c1'] = ListFolderResult([FileMetadata(name='Monefy.Data.1', content_hash='b' * 64)], 'c2', False)
+        self.pages['c2'] = ListFolderResult([], 'c2', False)
+        provider = self.create_provider()
+        self.assertTrue(provider.get_newest_monefy_data())
+        self.assertIn(('download', '/Monefy.Data.1'), provider.dbx.calls)
+
+    def test_download_repeated_without_local_file(self):
+        self.create_provider().get_newest_monefy_data()
+        os.remove(os.path.join(self.directory, 'Monefy_data.csv'))
+        self.assertTrue(self.create_provider().get_newest_monefy_data())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+import aiopg
+
+from database import helpers
+from database.data_version import DataVersion, CHANNEL
+
+
+class DataVersionTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.version = DataVersion()
+
+    async def wait_for(self, condition):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+    def test_bump(self):
+        self.assertEqual(self.version.bump(), 1)
+        self.assertEqual(self.version.value, 1)
+
+    def test_notification_bumps_version(self):
+        async def scenario():
+            # default database of the server, database of the application may not exist
+            self.version.start(helpers.dsn_def)
+            await asyncio.wait_for(self.wait_for(lambda: self.version.listening), 5)
+            value = self.version.value
+            async with aiopg.connect(helpers.dsn_def) as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute('notify {}'.format(CHANNEL))
+            await asyncio.wait_for(self.wait_for(lambda: self.version.value > value), 5)
+            await self.version.stop()
+
+        self.loop.run_until_complete(scenario())
+        self.assertFalse(self.version.listening)
+        self.assertFalse(self.version.started)
+
+    def test_stop_while_connecting(self):
+        async def scenario():
+            self.version.start(helpers.dsn_def)
+            await asyncio.sleep(0)
+            await asyncio.wait_for(self.version.stop(), 5)
+
+        self.loop.run_until_complete(scenario())
+        self.assertFalse(self.version.listening)
+
+
+if __name__ == '__main__':
+    unittest.main()
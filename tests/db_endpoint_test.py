@@ -1,6 +1,9 @@
+import asyncio
 import unittest
 import json
+from unittest import mock
 from monefystat_api.app import app
+from database import helpers
 
 
 class ACreateTest(unittest.TestCase):
@@ -22,6 +25,40 @@ class BDataTest(unittest.TestCase):
         request, response = app.test_client.put('/data')
         assert response.status == 405
 
+    def test_data_returns_page(self):
+        params = {'limit': '10', 'category': 'еда', 'start_date': '25-03-2018', 'end_date': '25-04-2018'}
+        request, response = app.test_client.get('/data', params=params)
+        assert response.status == 200
+        assert response.json == {'data': [], 'next_cursor': None}
+
+    def test_data_invalid_cursor(self):
+        request, response = app.test_client.get('/data', params={'cursor': 'abc'})
+        assert response.status == 400
+
+    def test_export_returns_ndjson(self):
+        request, response = app.test_client.get('/export')
+        assert response.status == 200
+        assert response.headers['Content-Type'] == 'application/x-ndjson'
+
+    def test_totals_returns_200(self):
+        params = {'start_date': '25-03-2018', 'end_date': '25-04-2018', 'bucket': 'week'}
+        request, response = app.test_client.get('/totals', params=params)
+        assert response.status == 200
+        assert response.json == []
+
+    def test_totals_invalid_bucket(self):
+        params = {'start_date': '25-03-2018', 'end_date': '25-04-2018', 'bucket': 'hour'}
+        request, response = app.test_client.get('/totals', params=params)
+        assert response.status == 400
+
+    def test_totals_without_dates(self):
+        request, response = app.test_client.get('/totals')
+        assert response.status == 400
+
+    def test_data_invalid_limit(self):
+        request, response = app.test_client.get('/data', params={'limit': '0'})
+        assert response.status == 400
+
 
 class CDefinedPeriodTest(unittest.TestCase):
     def test_get_data_for_def_period_returns_200(self):
@@ -30,6 +67,25 @@ class CDefinedPeriodTest(unittest.TestCase):
             '/data_def_period', params=params)
         assert response.status == 200
 
+    def test_cache_stats(self):
+        request, response = app.test_client.get('/cache')
+        assert response.status == 200
+        assert set(response.json['data_period']) == {'hits', 'misses', 'size', 'maxsize', 'ttl'}
+
+    def test_get_data_for_def_period_cached_while_listening(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self.addCleanup(loop.close)
+        self.addCleanup(loop.run_until_complete, helpers.close_engine())
+        stats = helpers.data_period_cache.stats()
+        with mock.patch.object(helpers.data_version, 'listening', False):
+            loop.run_until_complete(helpers.get_data_period('еда', period='30'))
+        assert helpers.data_period_cache.stats() == stats
+        with mock.patch.object(helpers.data_version, 'listening', True):
+            loop.run_until_complete(helpers.get_data_period('еда', period='30'))
+            loop.run_until_complete(helpers.get_data_period('еда', period='30'))
+        assert helpers.data_period_cache.stats()['hits'] == stats['hits'] + 1
+
     def test_get_data_for_def_period_put_not_allowed(self):
         request, response = app.test_client.put('/data_def_period')
         assert response.status == 405
@@ -0,0 +1,92 @@
+'''
+Fake Telegram Bot API server for offline tests of the bot.
+It records called methods and answers sendMessage, setWebhook, deleteWebhook and getUpdates.
+
+Manual run: python -m tests.fake_telegram [port], then start the app with
+TELEGRAM_API_URL=http://localhost:<port>/bot{0}/{1}
+'''
+import sys
+import json
+import threading
+from socketserver import ThreadingMixIn
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qsl
+
+
+class FakeTelegram(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0):
+        super().__init__(('127.0.0.1', port), FakeTelegramHandler)
+        self.calls = []
+        self.webhook_url = ''
+        self._thread = None
+
+    @property
+    def api_url(self) -> str:
+        return 'http://127.0.0.1:{}/bot{{0}}/{{1}}'.format(self.server_address[1])
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        self._thread.join()
+
+    def sent_messages(self) -> list:
+        return [(int(params['chat_id']), params['text']) for method, params in self.calls if method == 'sendMessage']
+
+    def answer(self, method: str, params: dict):
+        self.calls.append((method, params))
+        if method == 'sendMessage':
+            return {
+                'message_id': len(self.calls),
+                'date': 0,
+                'chat': {'id': int(params['chat_id']), 'type': 'private'},
+                'text': params['text']
+            }
+        if method == 'setWebhook':
+            self.webhook_url = params.get('url', '')
+            return True
+        if method == 'deleteWebhook':
+            self.webhook_url = ''
+            return True
+        if method == 'getUpdates':
+            return []
+        return None
+
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        # path is /bot<token>/<method>
+        method = url.path.rsplit('/', 1)[-1]
+        params = dict(parse_qsl(url.query))
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            params.update(parse_qsl(self.rfile.read(length).decode()))
+        result = self.server.answer(method, params)
+        if result is None:
+            body = {'ok': False, 'error_code': 404, 'description': 'Not Found'}
+        else:
+            body = {'ok': True, 'result': result}
+        payload = json.dumps(body).encode()
+        self.send_response(200 if body['ok'] else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_POST = do_GET
+
+    def log_message(self, format, *args):
+        if self.server._thread is None:
+            super().log_message(format, *args)
+
+
+if __name__ == '__main__':
+    server = FakeTelegram(int(sys.argv[1]) if len(sys.argv) > 1 else 8081)
+    print('Fake Telegram Bot API on', server.api_url)
+    server.serve_forever()
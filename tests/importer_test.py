@@ -0,0 +1,107 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+from processor import importer, fingerprint, validator_data
+
+CSV_CONTENT = (
+    'date,account,category,amount,currency,converted amount,currency,description\n'
+    '01/03/2018,Cash,Food,-10,UAH,-10,UAH,lunch\n'
+    '02/03/2018,Cash,Taxi,-50,UAH,-50,UAH,\n'
+    '02/03/2018,Card,Salary,"10,000.00",UAH,"10,000.00",UAH,march salary\n'
+    '01/03/2018,Cash,Cafe,-10,UAH,-10,UAH,lunch\n'
+    '03/03/2018,Card,Food,-12.5,UAH,-12.5,UAH,"coffee, cake"\n'
+)
+
+
+class ImporterTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+
+        descriptor, self.file_csv = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(descriptor, 'w', encoding='utf8') as csvfile:
+            csvfile.write(CSV_CONTENT)
+        self.addCleanup(os.remove, self.file_csv)
+        self.rows = validator_data.validate_data(self.file_csv)
+
+        self.imported = {}
+        self.state = {}
+        self.ingested = []
+        for target, replacement in (
+                (importer.helpers, 'get_row_fingerprints'),
+                (importer.helpers, 'upsert_row_fingerprints'),
+                (importer.helpers, 'get_import_state'),
+                (importer.helpers, 'set_import_state'),
+                (importer.mapper, 'ingest_transactions')):
+            patcher = mock.patch.object(target, replacement, getattr(self, replacement))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(importer.ingest, {'batch_size': 2})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def get_row_fingerprints(self, keys):
+        return {key: self.imported[key] for key in keys if key in self.imported}
+
+    async def upsert_row_fingerprints(self, fingerprints, batch_size=None):
+        self.imported.update(fingerprints)
+
+    async def get_import_state(self, name):
+        return self.state.get(name)
+
+    async def set_import_state(self, name, value):
+        self.state[name] = value
+
+    async def ingest_transactions(self, transactions):
+        rows = list(transactions)
+        self.ingested.append(rows)
+        return {'inserted': len(rows), 'updated': 0}
+
+    def import_file(self):
+        return self.loop.run_until_complete(importer.import_file(self.file_csv))
+
+    def test_first_import(self):
+        result = self.import_file()
+        # the first row is overwritten by the fourth one from the other chunk
+        self.assertEqual(result, {'inserted': 4, 'updated': 0, 'unchanged': 1})
+        self.assertEqual([row[2] for row in self.ingested[0]], ['Taxi', 'Salary', 'Cafe', 'Food'])
+        self.assertEqual(self.state[importer.FILE_FINGERPRINT], fingerprint.file_fingerprint(self.file_csv))
+        self.assertEqual(self.imported[fingerprint.row_key(self.rows[0])], fingerprint.row_fingerprint(self.rows[3]))
+
+    def test_only_changed_rows_are_ingested(self):
+        for row in self.rows[:3]:
+            self.imported[fingerprint.row_key(row)] = fingerprint.row_fingerprint(row)
+        result = self.import_file()
+        self.assertEqual(result, {'inserted': 2, 'updated': 0, 'unchanged': 3})
+        self.assertEqual([row[2] for row in self.ingested[0]], ['Cafe', 'Food'])
+
+    def test_nothing_changed(self):
+        for row in self.rows[1:]:
+            self.imported[fingerprint.row_key(row)] = fingerprint.row_fingerprint(row)
+        result = self.import_file()
+        self.assertEqual(result, {'inserted': 0, 'updated': 0, 'unchanged': 5})
+        self.assertEqual(self.ingested, [])
+        self.assertIn(importer.FILE_FINGERPRINT, self.state)
+
+    def test_unchanged_file_is_skipped(self):
+        self.state[importer.FILE_FINGERPRINT] = fingerprint.file_fingerprint(self.file_csv)
+        self.assertIsNone(self.import_file())
+        self.assertEqual(self.ingested, [])
+
+    def test_failed_ingest_keeps_file_fingerprint(self):
+        async def ingest_transactions(transactions):
+            raise RuntimeError('database is down')
+
+        with mock.patch.object(importer.mapper, 'ingest_transactions', ingest_transactions):
+            with self.assertRaises(RuntimeError):
+                self.import_file()
+        self.assertEqual(self.state, {})
+        self.assertEqual(self.imported, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
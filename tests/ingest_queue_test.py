@@ -0,0 +1,186 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+from monefystat_api import ingest_queue as queue_module
+from monefystat_api.ingest_queue import IngestQueue
+
+
+class FakeLock(object):
+    def __init__(self, key):
+        self.key = key
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class IngestQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.runs = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        patcher = mock.patch.object(queue_module.helpers, 'AdvisoryLock', FakeLock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(queue_module, 'run_ingest', self.run_ingest)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def run_ingest(self):
+        self.runs += 1
+        self.started.set()
+        await self.release.wait()
+        return {'message': 'not modified'}
+
+    async def wait_finished(self, job):
+        while job.finished is None:
+            await asyncio.sleep(0.01)
+
+    def test_queued_notifications_are_merged(self):
+        queue = IngestQueue(debounce=0.05)
+
+        async def scenario():
+            queue.start()
+            first = queue.put()
+            second = queue.put()
+            self.release.set()
+            await self.wait_finished(first)
+            await queue.stop()
+            return first, second
+
+        first, second = self.loop.run_until_complete(scenario())
+        self.assertIs(first, second)
+        self.assertEqual(first.notifications, 2)
+        self.assertEqual(first.state, queue_module.DONE)
+        self.assertEqual(self.runs, 1)
+
+    def test_notification_during_run_reruns_job(self):
+        queue = IngestQueue()
+
+        async def scenario():
+            queue.start()
+            job = queue.put()
+            await self.started.wait()
+            self.assertIs(queue.put(), job)
+            self.assertTrue(job.dirty)
+            self.release.set()
+            await self.wait_finished(job)
+            await queue.stop()
+            return job
+
+        job = self.loop.run_until_complete(scenario())
+        self.assertEqual(job.runs, 2)
+        self.assertEqual(self.runs, 2)
+        self.assertFalse(job.dirty)
+        self.assertEqual(len(queue.jobs()), 1)
+
+    def test_new_job_after_finished(self):
+        queue = IngestQueue()
+        self.release.set()
+
+        async def scenario():
+            queue.start()
+            first = queue.put()
+            await self.wait_finished(first)
+            second = queue.put()
+            await self.wait_finished(second)
+            await queue.stop()
+            return first, second
+
+        first, second = self.loop.run_until_complete(scenario())
+        self.assertIsNot(first, second)
+        self.assertEqual(self.runs, 2)
+
+    def test_stop_when_cancellation_is_converted(self):
+        queue = IngestQueue()
+
+        async def run_ingest():
+            self.started.set()
+            try:
+                await self.release.wait()
+            except asyncio.CancelledError:
+                # like aiopg cancelled while it connects
+                raise RuntimeError('asynchronous connection attempt underway')
+
+        async def scenario():
+            queue.start()
+            job = queue.put()
+            await self.started.wait()
+            await asyncio.wait_for(queue.stop(), 1)
+            return job
+
+        with mock.patch.object(queue_module, 'run_ingest', run_ingest):
+            job = self.loop.run_until_complete(scenario())
+        self.assertEqual(job.state, queue_module.QUEUED)
+        self.assertIsNone(job.error)
+
+
+class FakeProvider(object):
+    downloaded = True
+    imported = []
+
+    def __init__(self, token, download_path):
+        self.download_path = download_path
+
+    def get_newest_monefy_data(self):
+        return self.downloaded
+
+    def mark_imported(self):
+        self.imported.append(self.download_path)
+
+
+class RunIngestTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.imported = []
+        self.import_error = None
+        descriptor, self.file_csv = tempfile.mkstemp(suffix='.csv')
+        os.close(descriptor)
+        self.addCleanup(os.remove, self.file_csv)
+        patchers = [
+            mock.patch.object(queue_module, 'DataProvider', FakeProvider),
+            mock.patch.object(queue_module, 'path', self.file_csv),
+            mock.patch.object(FakeProvider, 'imported', []),
+            mock.patch.object(queue_module.importer, 'import_file', self.import_file)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def import_file(self, file_csv):
+        if self.import_error:
+            raise self.import_error
+        self.imported.append(file_csv)
+        return {'inserted': 1, 'updated': 0, 'unchanged': 0}
+
+    def test_downloaded_file_is_imported(self):
+        result = self.loop.run_until_complete(queue_module.run_ingest())
+        self.assertEqual(result['message'], 'updated')
+        self.assertEqual(self.imported, [self.file_csv])
+        self.assertEqual(FakeProvider.imported, [self.file_csv])
+
+    def test_nothing_changed(self):
+        with mock.patch.object(FakeProvider, 'downloaded', False):
+            result = self.loop.run_until_complete(queue_module.run_ingest())
+        self.assertEqual(result, {'message': 'not modified'})
+        self.assertEqual(self.imported, [])
+
+    def test_failed_import_is_not_marked_imported(self):
+        self.import_error = ValueError('broken file')
+        with self.assertRaises(ValueError):
+            self.loop.run_until_complete(queue_module.run_ingest())
+        self.assertEqual(FakeProvider.imported, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from database.data_version import data_version
+from telegram_bot import limiter_helper
+from telegram_bot.limiter_helper import LimiterHelper
+
+LIMITS = [
+    {'id': 1, 'title': 'Food', 'limit': 100.0, 'start_date': None, 'period': 7, 'is_repeated': False},
+    {'id': 2, 'title': 'Taxi', 'limit': None, 'start_date': None, 'period': None, 'is_repeated': None}
+]
+
+
+class LimitsCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.addCleanup(self.loop.close)
+        self.queries = 0
+        patchers = [
+            mock.patch.object(limiter_helper, 'get_limit', self.get_limit),
+            mock.patch.object(limiter_helper, 'upsert_limit', self.change_limit),
+            mock.patch.object(limiter_helper, 'delete_limit', self.change_limit)
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        limiter_helper.limits_cache.clear()
+        self.addCleanup(limiter_helper.limits_cache.clear)
+        self.lhelper = LimiterHelper()
+        self.lhelper.category_name = 'Food'
+
+    async def get_limit(self):
+        self.queries += 1
+        return LIMITS
+
+    async def change_limit(self, category_name, **kwargs):
+        pass
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_flow_costs_one_query(self):
+        self.assertEqual(self.run_async(self.lhelper.get_categories()), ['Food', 'Taxi'])
+        self.assertEqual(self.run_async(self.lhelper.get_categories()), ['Food', 'Taxi'])
+        self.assertEqual(self.run_async(self.lhelper.get_limit_record()), LIMITS[:1])
+        self.assertEqual(self.run_async(LimiterHelper().get_limit_record()), LIMITS[:1])
+        self.assertEqual(self.queries, 1)
+
+    def test_insert_and_clear_limit_invalidate_cache(self):
+        self.run_async(self.lhelper.get_categories())
+        self.run_async(self.lhelper.insert_limit())
+        self.run_async(self.lhelper.get_categories())
+        self.assertEqual(self.queries, 2)
+        self.run_async(self.lhelper.clear_limit())
+        self.run_async(self.lhelper.get_limit_record())
+        self.assertEqual(self.queries, 3)
+
+    def test_new_data_version_is_miss(self):
+        self.run_async(self.lhelper.get_categories())
+        data_version.bump()
+        self.run_async(self.lhelper.get_categories())
+        self.assertEqual(self.queries, 2)
+
+    def test_ttl(self):
+        ttl = limiter_helper.limits_cache.stats()['ttl']
+        with mock.patch('database.query_cache.time.monotonic', return_value=100.0):
+            self.run_async(self.lhelper.get_categories())
+        with mock.patch('database.query_cache.time.monotonic', return_value=100.0 + ttl / 2):
+            self.run_async(self.lhelper.get_categories())
+        with mock.patch('database.query_cache.time.monotonic', return_value=101.0 + ttl):
+            self.run_async(self.lhelper.get_categories())
+        self.assertEqual(self.queries, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
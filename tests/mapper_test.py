@@ -0,0 +1,127 @@
+import asyncio
+import unittest
+from datetime import date
+
+import psycopg2
+
+from database import helpers
+from processor import mapper
+
+TRANSACTIONS = [
+    [date(2018, 3, 25), 'Cash', 'Food', -12.5, 'BYN', -12.5, 'BYN', 'bread'],
+    [date(2018, 3, 25), 'Cash', 'Taxi', -7.0, 'BYN', -7.0, 'BYN', ''],
+    [date(2018, 3, 26), 'Card', 'Salary', 1000.0, 'USD', 2000.0, 'BYN', 'march, "bonus"'],
+    # duplicate of the first row with other category, the last row wins
+    [date(2018, 3, 25), 'Cash', ' Groceries ', -12.5, 'BYN', -12.5, 'BYN', 'bread'],
+    [date(2018, 3, 27), 'Card', 'Taxi', -3.25, 'BYN', -3.25, 'BYN', 'airport'],
+    [date(1999, 12, 31), 'Кошелёк', 'Еда', -0.1, 'BYN', -0.1, 'BYN', 'хлеб'],
+]
+
+SNAPSHOT_QUERIES = (
+    '''
+    select t.transaction_date, t.account, c.title, t.amount, t.currency, t.converted_amount,
+           t.converted_currency, t.description, t.is_debet, t.identity_hash
+    from transaction t join category c on c.id = t.category
+    order by t.transaction_date, t.account, t.amount
+    ''',
+    'select title from category order by title',
+    '''
+    select d.transaction_date, c.title, d.currency, d.is_debet, d.amount, d.converted_amount, d.count
+    from daily_category_totals d join category c on c.id = d.category
+    order by d.transaction_date, c.title, d.currency, d.is_debet
+    '''
+)
+
+
+class StagingFileTest(unittest.TestCase):
+    def test_csv_quoting(self):
+        staging_file = mapper._StagingFile(TRANSACTIONS[1:3])
+        self.assertEqual(staging_file.read(), (
+            '0,"2018-03-25","Cash","taxi",7.0,"BYN",7.0,"BYN","",False\n'
+            '1,"2018-03-26","Card","salary",1000.0,"USD",2000.0,"BYN","march, ""bonus""",True\n'
+        ))
+
+    def test_read_chunks(self):
+        expected = mapper._StagingFile(TRANSACTIONS).read()
+        staging_file = mapper._StagingFile(TRANSACTIONS)
+        chunks = list(iter(lambda: staging_file.read(7), ''))
+        self.assertTrue(all(len(chunk) == 7 for chunk in chunks[:-1]))
+        self.assertEqual(''.join(chunks), expected)
+
+
+class IngestEnginesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(cls.loop)
+        cls.loop.run_until_complete(helpers.create_db())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.run_until_complete(helpers.drop_db())
+        cls.loop.close()
+
+    def setUp(self):
+        self.loop.run_until_complete(self.truncate())
+
+    async def truncate(self):
+        engine = await helpers.get_engine()
+        async with engine.acquire() as connection:
+            await connection.execute('truncate transaction, category, daily_category_totals cascade')
+        helpers.category_cache.invalidate()
+
+    async def snapshot(self):
+        engine = await helpers.get_engine()
+        async with engine.acquire() as connection:
+            tables = []
+            for query in SNAPSHOT_QUERIES:
+                result = await connection.execute(query)
+                tables.append([tuple(row.values()) for row in await result.fetchall()])
+            return tables
+
+    def ingest_twice(self, insert):
+        first = self.loop.run_until_complete(insert(TRANSACTIONS))
+        second = self.loop.run_until_complete(insert(TRANSACTIONS))
+        return first, second, self.loop.run_until_complete(self.snapshot())
+
+    def test_bulk_counts(self):
+        first, second, tables = self.ingest_twice(mapper.bulk_insert_transactions)
+        self.assertEqual(first, {'inserted': 5, 'updated': 0})
+        self.assertEqual(second, {'inserted': 0, 'updated': 5})
+        self.assertEqual([row[2] for row in tables[0]], ['еда', 'taxi', 'groceries', 'salary', 'taxi'])
+
+    def test_copy_counts(self):
+        first, second, tables = self.ingest_twice(mapper.copy_insert_transactions)
+        self.assertEqual(first, {'inserted': 5, 'updated': 0})
+        self.assertEqual(second, {'inserted': 0, 'updated': 5})
+
+    def test_engines_produce_same_tables(self):
+        bulk = self.ingest_twice(mapper.bulk_insert_transactions)[2]
+        self.loop.run_until_complete(self.truncate())
+        copy = self.ingest_twice(mapper.copy_insert_transactions)[2]
+        self.assertEqual(bulk, copy)
+        self.assertEqual(len(bulk[0]), 5)
+        # category of the overwritten duplicate is created by both engines
+        self.assertEqual(bulk[1], [('food',), ('groceries',), ('salary',), ('taxi',), ('еда',)])
+
+    def test_legacy_engine_produces_same_tables(self):
+        bulk = self.ingest_twice(mapper.bulk_insert_transactions)[2]
+        self.loop.run_until_complete(self.truncate())
+        self.loop.run_until_complete(mapper.insert_transactions(TRANSACTIONS))
+        self.assertEqual(self.loop.run_until_complete(self.snapshot()), bulk)
+
+    def test_identity_hash_is_required(self):
+        async def insert_without_hash():
+            engine = await helpers.get_engine()
+            async with engine.acquire() as connection:
+                await connection.execute('''
+                    insert into transaction (transaction_date, account, amount, currency, description)
+                    values ('2018-03-25', 'Cash', 1.0, 'BYN', 'no hash')
+                ''')
+
+        with self.assertRaises(psycopg2.IntegrityError):
+            self.loop.run_until_complete(insert_without_hash())
+
+
+if __name__ == '__main__':
+    unittest.main()
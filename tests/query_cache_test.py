@@ -0,0 +1,43 @@
+import unittest
+from unittest import mock
+
+from database.query_cache import QueryCache
+
+
+class QueryCacheTest(unittest.TestCase):
+    def test_hit_and_miss(self):
+        cache = QueryCache()
+        self.assertIsNone(cache.get('key', 1))
+        cache.set('key', 1, [1, 2])
+        self.assertEqual(cache.get('key', 1), [1, 2])
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_new_version_is_miss(self):
+        cache = QueryCache()
+        cache.set('key', 1, [])
+        self.assertIsNone(cache.get('key', 2))
+        self.assertEqual(cache.stats()['size'], 0)
+
+    def test_ttl(self):
+        cache = QueryCache(ttl=10)
+        with mock.patch('database.query_cache.time.monotonic', return_value=100.0):
+            cache.set('key', 1, [])
+        with mock.patch('database.query_cache.time.monotonic', return_value=105.0):
+            self.assertEqual(cache.get('key', 1), [])
+        with mock.patch('database.query_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.get('key', 1))
+
+    def test_lru_eviction(self):
+        cache = QueryCache(maxsize=2)
+        cache.set('a', 1, 'a')
+        cache.set('b', 1, 'b')
+        cache.get('a', 1)
+        cache.set('c', 1, 'c')
+        self.assertIsNone(cache.get('b', 1))
+        self.assertEqual(cache.get('a', 1), 'a')
+        self.assertEqual(cache.get('c', 1), 'c')
+
+
+if __name__ == '__main__':
+    unittest.main()
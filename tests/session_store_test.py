@@ -0,0 +1,72 @@
+import unittest
+from unittest import mock
+
+from telegram_bot.session_store import SessionStore
+
+
+class SessionStoreTest(unittest.TestCase):
+    def test_start_and_get(self):
+        store = SessionStore(dict)
+        session = store.start(5)
+        self.assertIs(store.get(5), session)
+        self.assertIsNone(store.get(6))
+        self.assertIsNot(store.start(5), session)
+        self.assertEqual(len(store), 1)
+
+    def test_remove(self):
+        store = SessionStore(dict)
+        store.start(5)
+        store.remove(5)
+        store.remove(6)
+        self.assertIsNone(store.get(5))
+
+    def test_ttl_is_prolonged_by_get(self):
+        store = SessionStore(dict, ttl=10)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=100.0):
+            session = store.start(5)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=108.0):
+            self.assertIs(store.get(5), session)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=117.0):
+            self.assertIs(store.get(5), session)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=128.0):
+            self.assertIsNone(store.get(5))
+        self.assertEqual(len(store), 0)
+
+    def test_expired_sessions_are_evicted_on_start(self):
+        store = SessionStore(dict, ttl=10)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=100.0):
+            store.start(5)
+            store.start(6)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=105.0):
+            store.get(6)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=112.0):
+            store.start(7)
+        self.assertEqual(len(store), 2)
+
+    def test_least_recently_used_session_is_evicted(self):
+        store = SessionStore(dict, maxsize=2)
+        store.start(5)
+        store.start(6)
+        store.get(5)
+        store.start(7)
+        self.assertIsNotNone(store.get(5))
+        self.assertIsNone(store.get(6))
+        self.assertIsNotNone(store.get(7))
+
+    def test_on_evict(self):
+        evicted = []
+        store = SessionStore(dict, maxsize=2, ttl=10, on_evict=evicted.append)
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=100.0):
+            store.start(5)
+            store.start(6)
+            store.start(7)
+            store.remove(6)
+        self.assertEqual(evicted, [5])
+        with mock.patch('telegram_bot.session_store.time.monotonic', return_value=111.0):
+            self.assertIsNone(store.get(7))
+            store.start(8)
+        self.assertEqual(evicted, [5, 7])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import unittest
+from datetime import datetime
+
+from telebot import types
+
+from telegram_bot import button_titles
+from telegram_bot.telegram_calendar import TelegramCalendar, ShownDates
+
+
+def make_message(chat_id):
+    return types.Message.de_json({'message_id': 1, 'date': 0, 'chat': {'id': chat_id, 'type': 'private'}, 'text': ''})
+
+
+def keyboard_rows(markup):
+    return [[button['text'] for button in row] for row in json.loads(markup)['keyboard']]
+
+
+class TelegramCalendarTest(unittest.TestCase):
+    def test_keyboard(self):
+        tcalendar = TelegramCalendar()
+        tcalendar.current_shown_dates[5] = (2018, 1)
+        rows = keyboard_rows(tcalendar.calendar_next_month(make_message(5)))
+        self.assertEqual(rows[0], [button_titles.PREVIOUS, 'February 2018', button_titles.NEXT])
+        self.assertEqual(rows[1], ['Mo', 'Tu', 'We', 'Th', 'Fr', 'Sa', 'Su'])
+        self.assertEqual(rows[2], [' ', ' ', ' ', '1', '2', '3', '4'])
+        self.assertEqual(rows[-2], ['26', '27', '28', ' ', ' ', ' ', ' '])
+        self.assertEqual(rows[-1], [button_titles.CANCEL])
+
+    def test_year_wraps(self):
+        tcalendar = TelegramCalendar()
+        message = make_message(5)
+        tcalendar.current_shown_dates[5] = (2018, 12)
+        tcalendar.calendar_next_month(message)
+        self.assertEqual(tcalendar.current_shown_dates[5], (2019, 1))
+        tcalendar.calendar_previous_month(message)
+        tcalendar.calendar_previous_month(message)
+        self.assertEqual(tcalendar.current_shown_dates[5], (2018, 11))
+
+    def test_keyboards_are_cached(self):
+        tcalendar = TelegramCalendar(cache_size=2)
+        for chat_id in (5, 6):
+            tcalendar.current_shown_dates[chat_id] = (2018, 1)
+            tcalendar.calendar_next_month(make_message(chat_id))
+        info = tcalendar.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+        tcalendar.calendar_next_month(make_message(5))
+        tcalendar.calendar_next_month(make_message(5))
+        self.assertEqual(tcalendar.cache_info().currsize, 2)
+
+    def test_evicted_chat_gets_current_month(self):
+        tcalendar = TelegramCalendar(shown_dates_size=1)
+        tcalendar.calendar_today(make_message(5))
+        tcalendar.calendar_today(make_message(6))
+        self.assertNotIn(5, tcalendar.current_shown_dates)
+        now = datetime.now()
+        tcalendar.calendar_next_month(make_message(5))
+        self.assertEqual(tcalendar.current_shown_dates[5], (now.year, now.month))
+
+
+class ShownDatesTest(unittest.TestCase):
+    def test_size_is_capped(self):
+        dates = ShownDates(maxsize=2)
+        dates[5] = (2018, 1)
+        dates[6] = (2018, 1)
+        dates[5] = (2018, 2)
+        dates[7] = (2018, 1)
+        self.assertEqual(list(dates), [5, 7])
+        self.assertEqual(dates[5], (2018, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import json
+import unittest
+from unittest import mock
+
+from telebot import apihelper
+
+import config
+from monefystat_api.app import app
+from telegram_bot.async_bot import set_api_url
+from telegram_bot.bot_handlers import bot
+from tests.fake_telegram import FakeTelegram
+
+
+def make_update(update_id, chat_id, text):
+    return {
+        'update_id': update_id,
+        'message': {'message_id': update_id, 'date': 0, 'chat': {'id': chat_id, 'type': 'private'}, 'text': text}
+    }
+
+
+class TelegramWebhookTest(unittest.TestCase):
+    def setUp(self):
+        self.telegram = FakeTelegram()
+        self.telegram.start()
+        self.addCleanup(self.telegram.stop)
+        self.addCleanup(set_api_url, apihelper._make_request.__defaults__[-1])
+        set_api_url(self.telegram.api_url)
+        patcher = mock.patch.dict(config.telegram, {'mode': 'webhook', 'webhook_secret': 'secret'})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_update_is_handled_by_bot(self):
+        request, response = app.test_client.post('/telegram/secret', data=json.dumps(make_update(1, 5, '/help')))
+        self.assertEqual(response.status, 200)
+        # the server waits for handlers of the bot before it stops
+        messages = self.telegram.sent_messages()
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0][0], 5)
+        self.assertIn('/get_data_period', messages[0][1])
+
+    def test_wrong_secret(self):
+        request, response = app.test_client.post('/telegram/wrong', data=json.dumps(make_update(1, 5, '/help')))
+        self.assertEqual(response.status, 404)
+        self.assertEqual(self.telegram.calls, [])
+
+    def test_bad_body(self):
+        for data in ('', 'not json', json.dumps([1]), json.dumps({'message': {}})):
+            request, response = app.test_client.post('/telegram/secret', data=data)
+            self.assertEqual(response.status, 400)
+        self.assertEqual(self.telegram.calls, [])
+
+    def test_secret_is_not_configured(self):
+        config.telegram['webhook_secret'] = None
+        request, response = app.test_client.post('/telegram/None', data=json.dumps(make_update(1, 5, '/help')))
+        self.assertEqual(response.status, 404)
+
+    def test_polling_mode(self):
+        config.telegram['mode'] = 'polling'
+        request, response = app.test_client.post('/telegram/secret', data=json.dumps(make_update(1, 5, '/help')))
+        self.assertEqual(response.status, 404)
+        self.assertEqual(self.telegram.calls, [])
+
+    def test_set_webhook(self):
+        bot.set_webhook(url='https://example.com/telegram/secret')
+        self.assertEqual(self.telegram.webhook_url, 'https://example.com/telegram/secret')
+        bot.remove_webhook()
+        self.assertEqual(self.telegram.webhook_url, '')
+
+
+if __name__ == '__main__':
+    unittest.main()
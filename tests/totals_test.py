@@ -0,0 +1,42 @@
+import asyncio
+import unittest
+from datetime import date
+
+from database import helpers
+from processor import mapper
+
+TRANSACTIONS = [
+    [date(2018, 3, 5), 'Cash', 'Food', -10.0, 'UAH', -10.0, 'UAH', 'bread'],
+    [date(2018, 3, 6), 'Card', 'Food', -2.0, 'USD', -54.0, 'UAH', 'coffee'],
+    [date(2018, 3, 7), 'Cash', 'Food', -5.0, 'UAH', -5.0, 'UAH', 'milk'],
+    [date(2018, 3, 8), 'Card', 'Food', 1.0, 'USD', 27.0, 'UAH', 'refund'],
+]
+
+
+class TotalsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(cls.loop)
+        cls.loop.run_until_complete(helpers.create_db())
+        cls.loop.run_until_complete(mapper.bulk_insert_transactions(TRANSACTIONS))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.loop.run_until_complete(helpers.drop_db())
+        cls.loop.close()
+
+    def test_currencies_are_not_mixed(self):
+        totals = self.loop.run_until_complete(helpers.get_totals(date(2018, 3, 1), date(2018, 3, 31)))
+        self.assertEqual([(row['category'], row['bucket'], row['currency']) for row in totals], [
+            ('food', date(2018, 3, 1), 'UAH'),
+            ('food', date(2018, 3, 1), 'USD')
+        ])
+        uah, usd = totals
+        self.assertEqual((uah['debet_amount'], uah['credit_amount'], uah['count']), (0, 15.0, 2))
+        self.assertEqual((usd['debet_amount'], usd['credit_amount'], usd['count']), (1.0, 2.0, 2))
+        self.assertEqual((usd['debet_converted_amount'], usd['credit_converted_amount']), (27.0, 54.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from processor import validator_data
+
+
+CSV_CONTENT = (
+    'date,account,category,amount,currency,converted amount,currency,description\n'
+    '01/03/2018,Cash,Food,"-1 234,56",UAH,"-1 234,56",UAH,lunch\n'
+    '02/03/2018,Cash,Taxi,-50,UAH,-50,UAH,\n'
+    '\n'
+    '02/03/2018,Card,Salary,"10,000.00",UAH,"10,000.00",UAH,march salary\n'
+    '03/03/2018,Card,Food,-12.5,UAH,-12.5,UAH,"coffee, cake"\n'
+)
+
+
+class ValidatorDataTest(unittest.TestCase):
+    def setUp(self):
+        self.file_csv = self.write_file(CSV_CONTENT)
+
+    def write_file(self, content):
+        descriptor, file_csv = tempfile.mkstemp(suffix='.csv')
+        with os.fdopen(descriptor, 'w', encoding='utf8') as csvfile:
+            csvfile.write(content)
+        self.addCleanup(os.remove, file_csv)
+        return file_csv
+
+    def test_validate_data(self):
+        data = validator_data.validate_data(self.file_csv)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(data[0], [date(2018, 3, 1), 'Cash', 'Food', -1234.56, 'UAH', -1234.56, 'UAH', 'lunch'])
+        self.assertEqual(data[2][3], 10000.0)
+        self.assertEqual(data[3][7], 'coffee,cake')
+
+    def test_semicolon_delimiter(self):
+        file_csv = self.write_file(
+            'date;account;category;amount;currency;converted amount;currency;description\n'
+            '01/03/2018;Cash;Food;-12,5;UAH;-12,5;UAH;lunch\n'
+        )
+        self.assertEqual(validator_data.validate_data(file_csv)[0][3], -12.5)
+
+    def test_invalid_header(self):
+        file_csv = self.write_file('date,account\n01/03/2018,Cash\n')
+        with self.assertRaises(validator_data.ValidationError):
+            validator_data.iter_validate_data(file_csv)
+
+    def test_iter_validate_data_equals_validate_data(self):
+        self.assertEqual(list(validator_data.iter_validate_data(self.file_csv)),
+                         validator_data.validate_data(self.file_csv))
+
+    def test_columnar_data(self):
+        data = validator_data.validate_data(self.file_csv, columnar=True)
+        self.assertEqual(len(data), 4)
+        self.assertEqual(list(data), validator_data.validate_data(self.file_csv))
+        self.assertEqual(data.categories.values, ['Food', 'Taxi', 'Salary'])
+        self.assertEqual(list(data.categories.codes), [0, 1, 2, 0])
+
+    def test_columnar_sum_by_category(self):
+        data = validator_data.validate_data(self.file_csv, columnar=True)
+        sums = data.sum_by_category(start_date=date(2018, 3, 2))
+        self.assertEqual(sums, {'Food': -12.5, 'Taxi': -50.0, 'Salary': 10000.0})
+
+    def test_iter_validate_data_chunks(self):
+        chunks = list(validator_data.iter_validate_data(self.file_csv, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 1])
+        self.assertEqual(chunks[0] + chunks[1], validator_data.validate_data(self.file_csv))
+
+
+class FastConvertRowTest(unittest.TestCase):
+    rows = [
+        ['01/03/2018', 'Cash', 'Food', '-1 234,56', 'UAH', '-1\xa0234,56', 'UAH', 'lunch'],
+        ['02/03/2018', 'Card', 'Salary', '10,000.00', 'UAH', '"10,000.00"', 'UAH', 'march salary'],
+        ['3/3/2018', 'Card', 'Food ', '-12.5', 'UAH', '-12,5', 'USD', '"coffee", cake'],
+        ['04/03/2018', 'Card', 'Car', '-1,234', 'UAH', '-1,2,3', 'UAH', ''],
+        ['05/03/2018', 'Card', 'Car', '7', 'UAH', '7', 'UAH', 'extra', ' column ']
+    ]
+
+    def test_same_result_as_convert_type(self):
+        for row in self.rows:
+            expected = validator_data.convert_type(validator_data.convert_row(list(row)))
+            self.assertEqual(validator_data.fast_convert_row(row), expected)
+
+    def test_invalid_amount(self):
+        with self.assertRaises(ValueError):
+            validator_data.fast_convert_row(['01/03/2018', 'Cash', 'Food', 'abc', 'UAH', '1', 'UAH', ''])
+
+
+if __name__ == '__main__':
+    unittest.main()
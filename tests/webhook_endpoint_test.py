@@ -24,6 +24,26 @@ class Webhook_test(unittest.TestCase):
         request, response = app.test_client.post('/webhook', data=data)
         assert request.json.get('key1') == 'value1'
 
+    def test_webhook_post_returns_202(self):
+        request, response = app.test_client.post('/webhook', data=json.dumps({}))
+        assert response.status == 202
+        assert response.json['job']['state'] in ('queued', 'running', 'done', 'failed')
+
+    def test_ingest_job_status(self):
+        request, response = app.test_client.post('/webhook', data=json.dumps({}))
+        job_id = response.json['job']['id']
+        request, response = app.test_client.get('/ingest/' + job_id)
+        assert response.status == 200
+        assert response.json['id'] == job_id
+
+    def test_ingest_jobs_returns_200(self):
+        request, response = app.test_client.get('/ingest')
+        assert response.status == 200
+
+    def test_ingest_unknown_job_returns_404(self):
+        request, response = app.test_client.get('/ingest/unknown')
+        assert response.status == 404
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,6 +1,9 @@
 import dropbox
 import re
+import os
+import json
 from datetime import datetime
+from dropbox.files import FileMetadata, DeletedMetadata
 
 
 class DataProvider(object):
@@ -10,12 +13,14 @@ class DataProvider(object):
         get_files_list
         get_file_by_name
         get_newest_monefy_data
+        mark_imported
     '''
     def __init__(self,
                  access_token: str,
                  download_path='',
                  working_directory='/',
-                 mode='auto'):
+                 mode='auto',
+                 state_path=None):
         '''
         :param str access_token: dropbox API token.
         :param str download_path: path to folder for providing data (sould include file name).
@@ -23,6 +28,8 @@ class DataProvider(object):
         :param str mode: using for switching workflow, can take only two values:
             'auto' - when dropbox working directory refreshing automatically,
             'manual' - when user refreshing dropbox working directory manually.
+        :param str state_path: path to file where list_folder cursor and known entries are stored between runs,
+            by default 'download_path' + '.state.json', state is not stored if both paths are empty.
 
         Warning: 'download_path' are relative to module where method calls.
 
@@ -31,11 +38,16 @@ class DataProvider(object):
         assert isinstance(download_path, str), 'path should be str type.'
         assert working_directory.startswith('/'), 'working directory should starts with \'/\''
         assert mode == 'auto' or mode == 'manual', 'mode should be \'auto\' or \'manual\''
+        assert state_path is None or isinstance(state_path, str), 'state path should be str type.'
 
         self.dbx = dropbox.Dropbox(access_token)
         self._download_path = download_path
         self._working_directory = working_directory
         self._mode = mode
+        if state_path is None:
+            state_path = download_path + '.state.json' if download_path else ''
+        self._state_path = state_path
+        self._state = None
 
     @property
     def download_path(self):
@@ -96,35 +108,85 @@ class DataProvider(object):
             return list_of_elements[0][1]
 
     def __get_newest_monefy_data_name_auto(self) -> str or None:
-        if self._working_directory != '/':
-            directory = self._working_directory
-        else:
-            directory = ''
-
-        list_of_files = self.dbx.files_list_folder(directory).entries
+        list_of_files = self.get_files_list()
         list_of_files.reverse()
 
-        for entry in list_of_files:
-            if entry.name.startswith('Monefy.Data'):
-                return entry.name
+        for name in list_of_files:
+            if name.startswith('Monefy.Data'):
+                return name
+
+    def __get_directory(self) -> str:
+        if self._working_directory == '/':
+            return ''
+        return self._working_directory
+
+    def __load_state(self) -> dict:
+        if self._state is None:
+            self._state = {}
+            if self._state_path and os.path.isfile(self._state_path):
+                try:
+                    with open(self._state_path, 'r', encoding='utf8') as state_file:
+                        self._state = json.load(state_file)
+                except ValueError:
+                    self._state = {}
+        return self._state
+
+    def __save_state(self) -> None:
+        if self._state_path:
+            tmp_path = self._state_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf8') as state_file:
+                json.dump(self._state, state_file)
+            os.replace(tmp_path, self._state_path)
+
+    def __sync_folder(self) -> dict:
+        '''
+        Brings known entries of working directory up to date. Only entries changed since the
+        stored cursor are fetched, full listing is requested on first call or after cursor reset.
+
+        :returns dict: metadata of entries by names, in order of their last change.
+        :raises: dropbox.exceptions.ApiError.
+        '''
+        directory = self.__get_directory()
+        folders = self.__load_state().setdefault('folders', {})
+        folder = folders.get(directory)
+
+        result = None
+        if folder:
+            try:
+                result = self.dbx.files_list_folder_continue(folder['cursor'])
+            except dropbox.exceptions.ApiError as error:
+                if not error.error.is_reset():
+                    raise
+        if result is None:
+            folder = {'cursor': None, 'entries': {}}
+            result = self.dbx.files_list_folder(directory)
+
+        entries = folder['entries']
+        while True:
+            for entry in result.entries:
+                entries.pop(entry.name, None)
+                if isinstance(entry, FileMetadata):
+                    entries[entry.name] = {'content_hash': entry.content_hash}
+                elif not isinstance(entry, DeletedMetadata):
+                    entries[entry.name] = {}
+            if not result.has_more:
+                break
+            result = self.dbx.files_list_folder_continue(result.cursor)
+
+        folder['cursor'] = result.cursor
+        folders[directory] = folder
+        self.__save_state()
+        return entries
 
     def get_files_list(self) -> list:
         '''
         This method returns list of file and folder names which contains in app folder.
+        Only changes since the previous call are requested from dropbox.
 
         :returns list: list of names of files.
         :raises: dropbox.exceptions.ApiError.
         '''
-        result = []
-
-        if self._working_directory == '/':
-            directory = ''
-        else:
-            directory = self._working_directory
-
-        for entry in self.dbx.files_list_folder(directory).entries:
-            result.append(entry.name)
-        return result
+        return list(self.__sync_folder().keys())
 
     def get_file_by_name(self, file_name: str) -> None:
         '''
@@ -137,11 +199,14 @@ class DataProvider(object):
         path_to_file = self._working_directory + '/' + file_name
         self.dbx.files_download_to_file(self.download_path, path_to_file)
 
-    def get_newest_monefy_data(self) -> None:
+    def get_newest_monefy_data(self) -> bool:
         '''
         This method download newest monefy.data file to 'self.download_path'.
+        Download is skipped if dropbox content hash of the newest file is equal to
+        the hash of the file which was downloaded last time and this file is still in place.
+        Such file is new data until `mark_imported` is called, so a failed import is retried.
 
-        :rtype: None
+        :returns bool: True if there is data which is not imported yet, False if nothing changed.
         :raises: dropbox.exceptions.ApiError.
         '''
         newest_file_name = None
@@ -151,9 +216,40 @@ class DataProvider(object):
         elif self._mode == 'auto':
             newest_file_name = self.__get_newest_monefy_data_name_auto()
 
-        if newest_file_name:
-            if self._working_directory == '/':
-                path_to_file = self.working_directory + newest_file_name
-            else:
-                path_to_file = self._working_directory + '/' + newest_file_name
-            self.dbx.files_download_to_file(self.download_path, path_to_file)
+        if not newest_file_name:
+            return False
+
+        if self._working_directory == '/':
+            path_to_file = self.working_directory + newest_file_name
+        else:
+            path_to_file = self._working_directory + '/' + newest_file_name
+
+        state = self.__load_state()
+        entry = state['folders'][self.__get_directory()]['entries'][newest_file_name]
+        downloaded = state.get('downloaded', {})
+        if entry.get('content_hash') and \
+                downloaded.get('content_hash') == entry['content_hash'] and \
+                downloaded.get('download_path') == self.download_path and \
+                os.path.isfile(self.download_path):
+            return not downloaded.get('imported', False)
+
+        metadata = self.dbx.files_download_to_file(self.download_path, path_to_file)
+        state['downloaded'] = {
+            'path': path_to_file,
+            'download_path': self.download_path,
+            'content_hash': getattr(metadata, 'content_hash', None)
+        }
+        self.__save_state()
+        return True
+
+    def mark_imported(self) -> None:
+        '''
+        This method marks the file downloaded by `get_newest_monefy_data` as imported,
+        so it is not reported as new data until content of the newest file changes.
+
+        :rtype: None
+        '''
+        state = self.__load_state()
+        if 'downloaded' in state:
+            state['downloaded']['imported'] = True
+            self.__save_state()